@@ -0,0 +1,114 @@
+import os
+import time
+from typing import Optional, Union
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+
+from app.auth.jwt import decode_access_token
+from app.models.user import User
+from app.models.projections import UserSummary
+from app.schemas.user import Principal
+from app.utils.cache import TTLCache
+from app.utils.user_directory import user_directory
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 2048))
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# token -> Principal, each entry expiring together with its token
+_verified_tokens = TTLCache(maxsize=TOKEN_CACHE_SIZE)
+
+
+def principal_claims(user: User) -> dict:
+    return {
+        "sub": user.employee_id,
+        "name": user.name,
+        "role": user.role,
+        "manager_employee_id": user.manager_employee_id,
+    }
+
+
+def verify_token(token: str) -> Principal:
+    principal = _verified_tokens.get(token)
+    if principal is not None:
+        return principal
+
+    try:
+        claims = decode_access_token(token)
+        principal = Principal(
+            employee_id=claims["sub"],
+            name=claims["name"],
+            role=claims["role"],
+            manager_employee_id=claims.get("manager_employee_id"),
+        )
+        expires_at = float(claims["exp"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    _verified_tokens.set(token, principal, ttl=max(0, expires_at - time.time()))
+    return principal
+
+
+# -------------------------------
+# Dependencies
+# -------------------------------
+async def get_optional_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[Principal]:
+    if credentials is None:
+        return None
+    return verify_token(credentials.credentials)
+
+
+async def get_current_principal(
+    principal: Optional[Principal] = Depends(get_optional_principal),
+) -> Principal:
+    if principal is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+# -------------------------------
+# Authorization helpers
+# -------------------------------
+async def resolve_caller(
+    principal: Optional[Principal],
+    employee_id: str,
+    role: Optional[str] = None,
+    allow_manager: bool = False,
+) -> Optional[Union[Principal, UserSummary]]:
+    """Resolve the user a request acts as, or ``None`` if it has the wrong role.
+
+    With a token the claims are trusted as-is, so no database read happens; a
+    token for a different user is rejected with 403 unless ``allow_manager``
+    is set and the token belongs to that user's manager. Requests without a
+    token fall back to the cached user directory.
+    """
+    if principal is None:
+        if role is None:
+            return await user_directory.get(employee_id)
+        return await user_directory.get_with_role(employee_id, role)
+
+    if principal.employee_id == employee_id:
+        return principal if role is None or principal.role == role else None
+
+    if allow_manager and principal.role == "manager":
+        user = await user_directory.get(employee_id)
+        if user and user.manager_employee_id == principal.employee_id:
+            return user if role is None or user.role == role else None
+
+    raise HTTPException(status_code=403, detail="Not authorized")
+
+
+def token_cache_stats() -> dict:
+    return _verified_tokens.stats()
@@ -0,0 +1,71 @@
+"""Single-round-trip conditional updates.
+
+Instead of ``Model.get`` + mutate + ``save`` these run one filtered
+``find_one_and_update`` that carries both the id and any authorization
+condition. Only when nothing matched is a second, cheap existence check
+made, to tell a missing document (404) from a failed condition (403).
+"""
+from typing import Optional, Tuple, Type
+
+from beanie import Document
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+
+def _object_id(doc_id) -> Optional[ObjectId]:
+    try:
+        return ObjectId(doc_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+async def conditional_update(
+    model: Type[Document],
+    doc_id,
+    update: dict,
+    conditions: Optional[dict] = None,
+    projection: Optional[dict] = None,
+    return_document: bool = ReturnDocument.AFTER,
+) -> Tuple[Optional[dict], bool]:
+    """Apply ``update`` if the document matches ``conditions``.
+
+    Returns ``(document, exists)``; ``document`` is None when nothing was
+    updated, and ``exists`` tells whether the id itself was found.
+    """
+    oid = _object_id(doc_id)
+    if oid is None:
+        return None, False
+
+    collection = model.get_motor_collection()
+    doc = await collection.find_one_and_update(
+        {"_id": oid, **(conditions or {})},
+        update,
+        projection=projection,
+        return_document=return_document,
+    )
+    if doc is not None:
+        return doc, True
+    if not conditions:
+        return None, False
+    return None, await collection.count_documents({"_id": oid}, limit=1) > 0
+
+
+async def update_or_raise(
+    model: Type[Document],
+    doc_id,
+    update: dict,
+    not_found: str,
+    conditions: Optional[dict] = None,
+    forbidden: str = "Not authorized",
+    projection: Optional[dict] = None,
+    return_document: bool = ReturnDocument.AFTER,
+) -> dict:
+    """Like :func:`conditional_update`, raising 404 or 403 when nothing matched."""
+    doc, exists = await conditional_update(
+        model, doc_id, update, conditions, projection, return_document
+    )
+    if doc is None:
+        raise HTTPException(403 if exists else 404, forbidden if exists else not_found)
+    return doc
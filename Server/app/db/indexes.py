@@ -0,0 +1,140 @@
+"""Explain every hot query and report the ones that still scan a collection.
+
+Run as ``python -m app.db.indexes`` from the ``Server`` directory, or set
+``MONGO_EXPLAIN_ON_STARTUP=1`` to log the report when the app starts.
+The indexes themselves are declared on each model's ``Settings.indexes``
+and created by ``init_beanie`` inside ``init_db``.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Type
+
+from beanie import Document
+
+from app.models.user import User
+from app.models.feedback import Feedback
+from app.models.feedback_request import FeedbackRequest
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RegisteredQuery:
+    name: str
+    model: Type[Document]
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+@dataclass
+class QueryPlanReport:
+    name: str
+    collection: str
+    stages: List[str] = field(default_factory=list)
+
+    @property
+    def collscan(self) -> bool:
+        return "COLLSCAN" in self.stages
+
+
+# Shapes of the queries issued by the routers; values are placeholders.
+REGISTERED_QUERIES: List[RegisteredQuery] = [
+    RegisteredQuery("user_by_employee_id", User, {"employee_id": "E0"}),
+    RegisteredQuery("users_by_manager", User, {"manager_employee_id": "M0"}),
+    RegisteredQuery(
+        "feedback_by_employee", Feedback, {"employee_id": "E0"}, [("created_at", -1), ("_id", -1)]
+    ),
+    RegisteredQuery(
+        "feedback_by_manager", Feedback, {"manager_employee_id": "M0"}, [("created_at", -1), ("_id", -1)]
+    ),
+    RegisteredQuery(
+        "feedback_by_manager_and_tag",
+        Feedback,
+        {"manager_employee_id": "M0", "tags": "t"},
+        [("created_at", -1), ("_id", -1)],
+    ),
+    RegisteredQuery(
+        "feedback_by_employee_and_tag",
+        Feedback,
+        {"employee_id": "E0", "tags": "t"},
+        [("created_at", -1), ("_id", -1)],
+    ),
+    RegisteredQuery(
+        "feedback_requests_by_manager",
+        FeedbackRequest,
+        {"manager_employee_id": "M0"},
+        [("created_at", -1), ("_id", -1)],
+    ),
+    RegisteredQuery(
+        "feedback_requests_unseen_count",
+        FeedbackRequest,
+        {"manager_employee_id": "M0", "seen": False},
+    ),
+    RegisteredQuery(
+        "notifications_by_employee",
+        Notification,
+        {"employee_id": "E0"},
+        [("created_at", -1), ("_id", -1)],
+    ),
+]
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    stages = []
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_query(query: RegisteredQuery) -> QueryPlanReport:
+    cursor = query.model.get_motor_collection().find(query.filter)
+    if query.sort:
+        cursor = cursor.sort(query.sort)
+    explained = await cursor.explain()
+    winning_plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+    return QueryPlanReport(
+        name=query.name,
+        collection=query.model.Settings.name,
+        stages=_plan_stages(winning_plan),
+    )
+
+
+async def check_query_plans(
+    queries: List[RegisteredQuery] = REGISTERED_QUERIES,
+) -> List[QueryPlanReport]:
+    reports = [await explain_query(q) for q in queries]
+    for report in reports:
+        if report.collscan:
+            logger.warning(
+                "Query %s on %s falls back to COLLSCAN (plan: %s)",
+                report.name, report.collection, " <- ".join(report.stages),
+            )
+        else:
+            logger.info(
+                "Query %s on %s uses %s",
+                report.name, report.collection, " <- ".join(report.stages),
+            )
+    return reports
+
+
+async def _main() -> int:
+    from app.db.mongo import init_db
+
+    await init_db()
+    reports = await check_query_plans()
+    for report in reports:
+        status = "COLLSCAN" if report.collscan else "ok"
+        print(f"{status:9} {report.collection}.{report.name}: {' <- '.join(report.stages)}")
+    return 1 if any(r.collscan for r in reports) else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    raise SystemExit(asyncio.run(_main()))
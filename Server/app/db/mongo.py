@@ -1,29 +1,160 @@
 import motor.motor_asyncio
 from beanie import init_beanie
+from pymongo import monitoring
 from app.models.user import User
 from app.models.feedback import Feedback
 from app.models.feedback_request import FeedbackRequest
 from app.models.notification import Notification
+from app.models.unread_counter import UnreadCounter
+from app.models.comment import Comment
+from app.models.version_stamp import VersionStamp
+from app.models.sentiment_rollup import SentimentRollup
+from app.db.routing import MONGO_MAX_STALENESS_SECONDS
+from app.utils.metrics import command_metrics
+from app.utils.query_counter import query_counter
+from collections import Counter
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-async def init_db():
+# Connection pool and timeouts (defaults match pymongo's)
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000))
+# e.g. "zstd,snappy,zlib"; zstd and snappy need their python packages installed
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS")
+# Client-wide default; routes can override it, see app.db.routing
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE")
+
+DOCUMENT_MODELS = [
+    User,
+    Feedback,
+    FeedbackRequest,
+    Notification,
+    UnreadCounter,
+    Comment,
+    VersionStamp,
+    SentimentRollup
+]
+
+_client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts connection pool events for ``/stats``.
+
+    pymongo calls these from its own threads; plain int updates are safe
+    enough for monitoring numbers.
+    """
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = Counter()
+        self.pools_cleared = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        self.checkout_failures[str(event.reason)] += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.checked_out += 1
+        self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def stats(self) -> dict:
+        return {
+            "min_pool_size": MONGO_MIN_POOL_SIZE,
+            "max_pool_size": MONGO_MAX_POOL_SIZE,
+            "open": self.open,
+            "checked_out": self.checked_out,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "checkout_failures": dict(self.checkout_failures),
+            "pools_cleared": self.pools_cleared,
+        }
+
+
+pool_monitor = PoolMonitor()
+
+
+def client_options() -> dict:
+    options = {
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_monitor, command_metrics, query_counter],
+    }
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(MONGO_WAIT_QUEUE_TIMEOUT_MS)
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    if MONGO_READ_PREFERENCE:
+        options["readPreference"] = MONGO_READ_PREFERENCE
+        if MONGO_READ_PREFERENCE != "primary" and MONGO_MAX_STALENESS_SECONDS > 0:
+            options["maxStalenessSeconds"] = MONGO_MAX_STALENESS_SECONDS
+    return options
+
+
+async def init_db(uri: Optional[str] = None, client=None, database: Optional[str] = None):
+    """Connect and initialize Beanie.
+
+    ``uri`` defaults to ``MONGODB_URI`` and ``database`` to the one named in
+    it; benchmarks pass their own database, and can pass an already built
+    ``client`` (e.g. an in-memory stand-in).
+    """
+    global _client
     # Create MongoDB client using URI from .env
-    client = motor.motor_asyncio.AsyncIOMotorClient(os.getenv("MONGODB_URI"))
-    
-    # Get default database from the URI
-    database = client.get_default_database()
-    
-    # Initialize Beanie ODM with your models
-    await init_beanie(
-        database=database,
-        document_models=[
-            User,
-            Feedback,
-            FeedbackRequest,
-            Notification
-        ]
+    _client = client or motor.motor_asyncio.AsyncIOMotorClient(
+        uri or os.getenv("MONGODB_URI"), **client_options()
     )
+
+    # Named database, else the default one from the URI
+    db = _client.get_database(database) if database else _client.get_default_database()
+
+    # Initialize Beanie ODM with your models (also builds each model's Settings.indexes)
+    await init_beanie(database=db, document_models=DOCUMENT_MODELS)
+
+
+def close_db() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def pool_stats() -> dict:
+    return pool_monitor.stats()
@@ -0,0 +1,103 @@
+"""Per-route read preference.
+
+Read-heavy routes opt into a read preference with a route dependency such
+as :data:`dashboard_reads`; models that mix in :class:`RoutedReads` then
+read through a collection with that preference for the rest of the
+request. Everything else keeps the client's default (primary unless
+``MONGO_READ_PREFERENCE`` says otherwise). Writes always go to the primary.
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+
+# -1 means no limit; otherwise MongoDB requires at least 90 seconds
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", -1))
+# Unset: dashboards inherit the client's default (MONGO_READ_PREFERENCE)
+MONGO_DASHBOARD_READ_PREFERENCE = os.getenv("MONGO_DASHBOARD_READ_PREFERENCE")
+
+_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+_read_preference: ContextVar = ContextVar("mongo_read_preference", default=None)
+# Off for in-memory stand-ins (mongomock) whose collections lack a working with_options
+_routing_enabled = True
+
+
+def parse_read_preference(name: str):
+    if name == "primary":
+        return Primary()
+    if name not in _MODES:
+        raise ValueError(f"Unknown read preference {name!r}")
+    return _MODES[name](max_staleness=MONGO_MAX_STALENESS_SECONDS)
+
+
+class RoutedReads:
+    """Document mixin: reads follow the current route's read preference."""
+
+    @classmethod
+    def get_motor_collection(cls):
+        collection = super().get_motor_collection()
+        preference = _read_preference.get()
+        if preference is None or not _routing_enabled:
+            return collection
+        return collection.with_options(read_preference=preference)
+
+
+def disable_read_routing() -> None:
+    """Read every collection as the client does, e.g. for mongomock clients."""
+    global _routing_enabled
+    _routing_enabled = False
+
+
+def read_preference(name: Optional[str]):
+    """Route dependency that sends the request's reads to ``name``; ``None``
+    leaves them on the client's default."""
+    preference = parse_read_preference(name) if name else None
+
+    # Reset once the request is done: under httpx.ASGITransport the app runs
+    # in the caller's task, so the value would outlive the request
+    async def dependency() -> AsyncIterator[None]:
+        token = _read_preference.set(preference)
+        try:
+            yield
+        finally:
+            _read_preference.reset(token)
+
+    return dependency
+
+
+def primary_for_request() -> None:
+    """Send the rest of the current request's reads to the primary.
+
+    Only for routes with a :func:`read_preference` dependency (e.g.
+    :data:`default_reads`), which resets it once the request is done.
+    """
+    _read_preference.set(Primary())
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside a routed request, e.g. to fill a cache."""
+    token = _read_preference.set(Primary())
+    try:
+        yield
+    finally:
+        _read_preference.reset(token)
+
+
+dashboard_reads = read_preference(MONGO_DASHBOARD_READ_PREFERENCE)
+# Keeps the client's default; only scopes primary_for_request() to the request
+default_reads = read_preference(None)
@@ -1,9 +1,27 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.mongo import init_db
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.db.mongo import init_db, close_db, pool_stats
+from app.db.indexes import check_query_plans
+from app.auth.hash import password_hasher, bulk_password_hasher
+from app.auth.dependencies import token_cache_stats
 from app.routers import user, feedback, notification
+from app.utils.user_directory import user_directory
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.markdown_render import render_cache_stats
+from app.utils.tag_analytics import tag_cache_stats
+from app.utils import pdf_report
+from app.utils.notifications import notification_writer
+from app.utils.notification_hub import notification_hub
+from app.utils.responses import FAST_JSON, FastJSONResponse
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.utils.query_counter import QUERY_COUNT_HEADER, QueryCountMiddleware
 
-app = FastAPI(title="Feedback Tool")
+app = FastAPI(
+    title="Feedback Tool",
+    default_response_class=FastJSONResponse if FAST_JSON else JSONResponse,
+)
 
 # Adding middleware for CORS policy 
 app.add_middleware(
@@ -26,8 +44,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", QUERY_COUNT_HEADER],
 )
 
+app.add_middleware(QueryCountMiddleware)
+
+# Outermost, so it also times CORS preflights
+app.add_middleware(MetricsMiddleware)
+
 
 
 # Root route
@@ -35,10 +59,43 @@ app.add_middleware(
 def root():
     return{"message":"Welcome to Feedback API"}
 
+# In-process cache and queue statistics for this worker
+@app.get("/stats")
+def stats():
+    return {
+        "user_directory": user_directory.stats(),
+        "password_hasher": password_hasher.stats(),
+        "bulk_password_hasher": bulk_password_hasher.stats(),
+        "verified_tokens": token_cache_stats(),
+        "comment_html": render_cache_stats(),
+        "pdf_reports": pdf_report.report_cache_stats(),
+        "team_tags": tag_cache_stats(),
+        "notification_writer": notification_writer.stats(),
+        "notification_hub": notification_hub.stats(),
+        "mongo_pool": pool_stats(),
+    }
+
+# Prometheus metrics for this worker
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
 #Intialize MongoDB Atlas connection on startup
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    await notification_writer.start()
+    if os.getenv("MONGO_EXPLAIN_ON_STARTUP") == "1":
+        await check_query_plans()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await notification_writer.stop()
+    password_hasher.shutdown()
+    bulk_password_hasher.shutdown()
+    pdf_report.shutdown()
+    close_db()
+
 print ("Connected to MongoDB and intialized Beanie models.")
 app.include_router(user.router, prefix="/users", tags=["Users"])
 app.include_router(feedback.router, prefix="/feedback", tags=["Feedback"])
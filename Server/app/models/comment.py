@@ -0,0 +1,17 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class Comment(Document):
+    feedback_id: PydanticObjectId
+    employee_id: str
+    text: str
+    html: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "comments"
+        indexes = [
+            IndexModel([("feedback_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
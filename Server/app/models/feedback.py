@@ -1,9 +1,11 @@
 from beanie import Document
-from typing import Literal, List, Dict
+from app.db.routing import RoutedReads
+from typing import Literal, List, Dict, Optional
 from datetime import datetime
-from pydantic import ConfigDict
+from pydantic import ConfigDict, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
-class Feedback(Document):
+class Feedback(RoutedReads, Document):
     manager_employee_id: str
     employee_id: str
     strengths: str
@@ -11,11 +13,19 @@ class Feedback(Document):
     sentiment: Literal["positive", "neutral", "negative"]
     anonymous: bool = False
     tags: List[str] = []
-    comments: List[Dict[str, str]] = []
-    created_at: datetime = datetime.utcnow()
+    comments: List[Dict[str, str]] = []  # latest few only, see app.utils.comment_store
+    comment_count: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
     acknowledged: bool = False
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     class Settings:
         name = "feedback"
+        indexes = [
+            IndexModel([("employee_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("manager_employee_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            # Multikey: one entry per tag, for tag-filtered team histories
+            IndexModel([("manager_employee_id", ASCENDING), ("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
@@ -1,12 +1,19 @@
 from beanie import Document
+from app.db.routing import RoutedReads
 from datetime import datetime
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
-class FeedbackRequest(Document):
+class FeedbackRequest(RoutedReads, Document):
     employee_id: str
     manager_employee_id: str
     message: str
     seen: bool = False
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "feedback_requests"
+        indexes = [
+            IndexModel([("manager_employee_id", ASCENDING), ("seen", ASCENDING)]),
+            IndexModel([("manager_employee_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
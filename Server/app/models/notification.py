@@ -1,7 +1,8 @@
 from beanie import Document
 from datetime import datetime
-from pydantic import ConfigDict
+from pydantic import ConfigDict, Field
 from typing import Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class Notification(Document):
     employee_id: str
@@ -9,9 +10,12 @@ class Notification(Document):
     manager_employee_id: Optional[str] = None
     manager_name: Optional[str] = None
     seen: bool = False
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     class Settings:
         name = "notifications"
+        indexes = [
+            IndexModel([("employee_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
@@ -0,0 +1,62 @@
+"""Projection models: the subsets of each document that read paths need.
+
+Passing one to ``.project()`` makes Mongo send, and Beanie decode, only
+these fields instead of the whole document.
+"""
+from beanie import PydanticObjectId
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+
+
+class UserSummary(BaseModel):
+    employee_id: str
+    name: str
+    role: Literal["manager", "employee"]
+    manager_employee_id: Optional[str] = None
+
+
+class EmployeeId(BaseModel):
+    employee_id: str
+
+
+class FeedbackSummary(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    manager_employee_id: str
+    strengths: str
+    improvement: str
+    sentiment: str
+    acknowledged: bool = False
+    created_at: datetime
+
+
+class FeedbackView(BaseModel):
+    # Everything FeedbackOut returns
+    id: PydanticObjectId = Field(alias="_id")
+    manager_employee_id: str
+    employee_id: str
+    strengths: str
+    improvement: str
+    sentiment: str
+    anonymous: bool = False
+    tags: List[str] = []
+    comments: List[Dict[str, str]] = []
+    comment_count: int = 0
+    acknowledged: bool = False
+    created_at: datetime
+
+
+class FeedbackReportRow(BaseModel):
+    created_at: datetime
+    sentiment: str
+    strengths: str
+    improvement: str
+    tags: List[str] = []
+
+
+class FeedbackRequestSummary(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    employee_id: str
+    message: str
+    seen: bool = False
+    created_at: datetime
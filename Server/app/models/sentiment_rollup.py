@@ -0,0 +1,26 @@
+from beanie import Document
+from app.db.routing import RoutedReads
+from datetime import datetime
+from typing import Literal
+from pymongo import ASCENDING, IndexModel
+
+class SentimentRollup(RoutedReads, Document):
+    # One bucket of feedback sentiment counts, see app.utils.sentiment_rollups
+    manager_employee_id: str  # author of the counted feedback
+    employee_id: str
+    period: Literal["week", "month"]
+    bucket: datetime  # start of the week (Monday) or month, UTC
+    positive: int = 0
+    neutral: int = 0
+    negative: int = 0
+
+    class Settings:
+        name = "sentiment_rollups"
+        indexes = [
+            IndexModel(
+                [("manager_employee_id", ASCENDING), ("period", ASCENDING),
+                 ("bucket", ASCENDING), ("employee_id", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("employee_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING)]),
+        ]
@@ -0,0 +1,13 @@
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+class UnreadCounter(Document):
+    employee_id: str
+    notifications: int = 0
+    feedback_requests: int = 0
+
+    class Settings:
+        name = "unread_counters"
+        indexes = [
+            IndexModel([("employee_id", ASCENDING)], unique=True),
+        ]
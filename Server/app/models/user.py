@@ -1,9 +1,11 @@
 from beanie import Document
+from app.db.routing import RoutedReads
 from pydantic import BaseModel, EmailStr, Field
 from typing import Literal, Optional
 from pydantic import ConfigDict
+from pymongo import ASCENDING, IndexModel
 
-class User(Document):
+class User(RoutedReads, Document):
     name: str
     email: EmailStr
     password: str
@@ -15,3 +17,7 @@ class User(Document):
 
     class Settings:
         name = "users"  # Beanie collection name
+        indexes = [
+            IndexModel([("employee_id", ASCENDING)], unique=True),
+            IndexModel([("manager_employee_id", ASCENDING)]),
+        ]
@@ -0,0 +1,13 @@
+from beanie import Document
+from app.db.routing import RoutedReads
+from pymongo import ASCENDING, IndexModel
+
+class VersionStamp(RoutedReads, Document):
+    scope: str  # "employee:<id>" or "manager:<id>"
+    version: int = 0
+
+    class Settings:
+        name = "version_stamps"
+        indexes = [
+            IndexModel([("scope", ASCENDING)], unique=True),
+        ]
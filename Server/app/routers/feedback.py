@@ -1,16 +1,38 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Request
 from app.models.feedback import Feedback
 from app.models.user import User
 from app.models.feedback_request import FeedbackRequest
 from app.models.notification import Notification
+from app.auth.dependencies import get_optional_principal, resolve_caller
+from app.schemas.user import Principal
+from app.utils.user_directory import user_directory
+from app.utils.pagination import PageParams, fetch_page, set_next_cursor
+from app.utils.markdown_render import comments_for_display
+from app.utils import comment_store
+from app.models.comment import Comment
+from app.models.projections import EmployeeId, FeedbackRequestSummary, FeedbackView, UserSummary
+from app.db.atomic import update_or_raise
+from app.db.routing import dashboard_reads, default_reads
+from app.utils import pdf_report
+from app.utils.notifications import notify
+from app.utils.responses import fast_json
+from app.utils.notification_hub import notification_payload
+from app.utils import unread_counters
+from app.utils import versioning
+from app.utils import sentiment_rollups
+from app.utils import tag_analytics
+from bson import ObjectId
+from bson.errors import InvalidId
+from beanie import PydanticObjectId
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from app.schemas.feedback import (
-    FeedbackCreate, FeedbackOut, CommentIn, ExportPDFResponse, FeedbackRequestIn
+    FeedbackCreate, FeedbackOut, CommentIn, ExportPDFResponse, FeedbackRequestIn,
+    FeedbackBulkCreate
 )
 from datetime import datetime
-from typing import List
-import markdown2
-import io
-from reportlab.pdfgen import canvas
+from typing import List, Literal, Optional
 from fastapi.responses import StreamingResponse
 
 router = APIRouter()
@@ -19,18 +41,15 @@ router = APIRouter()
 # Create Feedback (Manager to Employee)
 # -----------------------------
 @router.post("/", response_model=FeedbackOut)
-async def create_feedback(payload: FeedbackCreate):
-    mgr = await User.find_one(
-        User.employee_id == payload.manager_employee_id,
-        User.role == "manager"
-    )
+async def create_feedback(
+    payload: FeedbackCreate,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, payload.manager_employee_id, "manager")
     if not mgr:
         raise HTTPException(404, "Manager not found")
 
-    employee = await User.find_one(
-        User.employee_id == payload.employee_id,
-        User.role == "employee"
-    )
+    employee = await user_directory.get_with_role(payload.employee_id, "employee")
     if not employee:
         raise HTTPException(404, "Employee not found")
 
@@ -47,33 +66,133 @@ async def create_feedback(payload: FeedbackCreate):
         created_at=datetime.utcnow()
     )
     await fb.insert()
+    await sentiment_rollups.apply([fb], 1)
+    await versioning.bump_feedback([fb.employee_id], fb.manager_employee_id)
 
-    await Notification(
+    notify(Notification(
         employee_id=payload.employee_id,
         manager_employee_id=mgr.employee_id,
         manager_name=mgr.name,
         message=f"You have received new feedback from manager {mgr.name}"
-    ).insert()
+    ))
 
     return FeedbackOut.from_feedback(fb, mgr.name)
 
 
+# -----------------------------
+# Create Feedback for many employees at once
+# -----------------------------
+@router.post("/bulk")
+async def create_feedback_bulk(
+    payload: FeedbackBulkCreate,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, payload.manager_employee_id, "manager")
+    if not mgr:
+        raise HTTPException(404, "Manager not found")
+
+    items = list(payload.items)
+    if payload.template:
+        items += [
+            FeedbackCreate(
+                manager_employee_id=payload.manager_employee_id,
+                employee_id=employee_id,
+                **payload.template.dict()
+            )
+            for employee_id in payload.employee_ids
+        ]
+    if not items:
+        raise HTTPException(400, "No feedback items given")
+
+    # Every employee checked against the manager in one query
+    team = {
+        emp.employee_id: emp
+        for emp in await User.find(
+            {"employee_id": {"$in": list({i.employee_id for i in items})}, "role": "employee"}
+        ).project(UserSummary).to_list()
+    }
+
+    results = [None] * len(items)
+    to_insert = []
+    now = datetime.utcnow()
+    for index, item in enumerate(items):
+        error = None
+        emp = team.get(item.employee_id)
+        if item.manager_employee_id != payload.manager_employee_id:
+            error = "manager_employee_id does not match the batch manager"
+        elif not emp:
+            error = "Employee not found"
+        elif emp.manager_employee_id != payload.manager_employee_id:
+            error = "Employee does not report to this manager"
+        else:
+            try:
+                to_insert.append((index, Feedback(
+                    employee_id=item.employee_id,
+                    manager_employee_id=item.manager_employee_id,
+                    strengths=item.strengths,
+                    improvement=item.improvement,
+                    sentiment=item.sentiment,
+                    anonymous=item.anonymous,
+                    tags=item.tags or [],
+                    acknowledged=False,
+                    comments=[],
+                    created_at=now
+                )))
+            except ValidationError as exc:
+                error = str(exc)
+        if error:
+            results[index] = {"index": index, "employee_id": item.employee_id,
+                              "status": "error", "detail": error}
+
+    failed = {}
+    if to_insert:
+        # insert_many does not write generated ids back, so assign them here
+        for _, fb in to_insert:
+            fb.id = PydanticObjectId()
+        try:
+            await Feedback.insert_many([fb for _, fb in to_insert], ordered=False)
+        except BulkWriteError as exc:
+            failed = {e["index"]: e.get("errmsg", "Insert failed") for e in exc.details.get("writeErrors", [])}
+
+    await sentiment_rollups.apply(
+        [fb for position, (_, fb) in enumerate(to_insert) if position not in failed], 1
+    )
+    for position, (index, fb) in enumerate(to_insert):
+        if position in failed:
+            results[index] = {"index": index, "employee_id": fb.employee_id,
+                              "status": "error", "detail": failed[position]}
+            continue
+        results[index] = {"index": index, "employee_id": fb.employee_id,
+                          "status": "created", "id": str(fb.id)}
+        notify(Notification(
+            employee_id=fb.employee_id,
+            manager_employee_id=mgr.employee_id,
+            manager_name=mgr.name,
+            message=f"You have received new feedback from manager {mgr.name}"
+        ))
+
+    await versioning.bump_feedback(
+        [r["employee_id"] for r in results if r["status"] == "created"],
+        payload.manager_employee_id
+    )
+
+    created = sum(1 for r in results if r["status"] == "created")
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
 # -----------------------------
 # Employee Requests Feedback
 # -----------------------------
 @router.post("/request")
-async def request_feedback(payload: FeedbackRequestIn):
-    emp = await User.find_one(
-        User.employee_id == payload.employee_id,
-        User.role == "employee"
-    )
+async def request_feedback(
+    payload: FeedbackRequestIn,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    emp = await resolve_caller(principal, payload.employee_id, "employee")
     if not emp:
         raise HTTPException(404, "Employee not found")
 
-    mgr = await User.find_one(
-        User.employee_id == payload.manager_employee_id,
-        User.role == "manager"
-    )
+    mgr = await user_directory.get_with_role(payload.manager_employee_id, "manager")
     if not mgr:
         raise HTTPException(404, "Manager not found")
 
@@ -85,13 +204,15 @@ async def request_feedback(payload: FeedbackRequestIn):
         created_at=datetime.utcnow()
     )
     await fr.insert()
+    await unread_counters.increment(payload.manager_employee_id, feedback_requests=1)
+    await versioning.bump(versioning.manager_scope(payload.manager_employee_id))
 
-    await Notification(
+    notify(Notification(
         employee_id=payload.manager_employee_id,
         manager_employee_id=payload.manager_employee_id,
         manager_name=mgr.name,
         message=f"Feedback request from employee {payload.employee_id}"
-    ).insert()
+    ))
 
     return {"message": "Feedback request submitted successfully"}
 
@@ -99,20 +220,33 @@ async def request_feedback(payload: FeedbackRequestIn):
 # -----------------------------
 # Get All Feedback Requests for Manager
 # -----------------------------
-@router.get("/requests/{manager_id}")
-async def get_feedback_requests(manager_id: str):
-    mgr = await User.find_one(
-        User.employee_id == manager_id,
-        User.role == "manager"
-    )
+@router.get("/requests/{manager_id}", dependencies=[Depends(default_reads)])
+async def get_feedback_requests(
+    manager_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
     if not mgr:
         raise HTTPException(404, "Manager not found")
 
-    requests = await FeedbackRequest.find(
-        FeedbackRequest.manager_employee_id == manager_id
-    ).sort("-created_at").to_list()
+    not_modified = await versioning.check_etag(
+        request, response, versioning.manager_scope(manager_id)
+    )
+    if not_modified:
+        return not_modified
+
+    requests, next_cursor = await fetch_page(
+        FeedbackRequest.find(
+            FeedbackRequest.manager_employee_id == manager_id
+        ).project(FeedbackRequestSummary),
+        page
+    )
+    set_next_cursor(response, next_cursor)
 
-    return [
+    return fast_json([
         {
             "id": str(req.id),
             "employee_id": req.employee_id,
@@ -121,20 +255,27 @@ async def get_feedback_requests(manager_id: str):
             "created_at": req.created_at
         }
         for req in requests
-    ]
+    ], response)
 
 
 # -----------------------------
 # Mark Feedback Request as Seen
 # -----------------------------
 @router.patch("/requests/{request_id}/seen")
-async def mark_feedback_request_seen(request_id: str):
-    req = await FeedbackRequest.get(request_id)
-    if not req:
+async def mark_feedback_request_seen(
+    request_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    req, exists = await unread_counters.mark_feedback_request_seen(
+        request_id,
+        {"manager_employee_id": principal.employee_id} if principal else None
+    )
+    if not exists:
         raise HTTPException(404, "Feedback request not found")
+    if not req:
+        raise HTTPException(403, "Not authorized")
+    await versioning.bump(versioning.manager_scope(req["manager_employee_id"]))
 
-    req.seen = True
-    await req.save()
     return {"message": "Feedback request marked as seen"}
 
 
@@ -142,63 +283,85 @@ async def mark_feedback_request_seen(request_id: str):
 # Count Unseen Requests for Manager
 # -----------------------------
 @router.get("/requests/{manager_id}/count-unseen")
-async def count_unseen_requests(manager_id: str):
-    mgr = await User.find_one(
-        User.employee_id == manager_id,
-        User.role == "manager"
-    )
+async def count_unseen_requests(
+    manager_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
     if not mgr:
         raise HTTPException(404, "Manager not found")
 
-    count = await FeedbackRequest.find(
-        FeedbackRequest.manager_employee_id == manager_id,
-        FeedbackRequest.seen == False
-    ).count()
-
-    return {"unseen_count": count}
+    counts = await unread_counters.get_counts(manager_id)
+    return {"unseen_count": counts["unseen_feedback_requests"]}
 
 
 # -----------------------------
 # View Feedback History (Employee)
 # -----------------------------
-@router.get("/employee/{employee_id}", response_model=List[FeedbackOut])
-async def get_feedback_history(employee_id: str):
-    fbs = await Feedback.find(Feedback.employee_id == employee_id).to_list()
+@router.get(
+    "/employee/{employee_id}",
+    response_model=List[FeedbackOut],
+    dependencies=[Depends(dashboard_reads)],
+)
+async def get_feedback_history(
+    employee_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    tag: Optional[str] = None,
+):
+    not_modified = await versioning.check_etag(
+        request, response, versioning.employee_scope(employee_id)
+    )
+    if not_modified:
+        return not_modified
+
+    query = Feedback.find(Feedback.employee_id == employee_id)
+    if tag:
+        query = query.find(Feedback.tags == tag)
+    fbs, next_cursor = await fetch_page(query.project(FeedbackView), page)
+    set_next_cursor(response, next_cursor)
+    managers = await user_directory.get_many(fb.manager_employee_id for fb in fbs)
     out = []
     for fb in fbs:
-        mgr = await User.find_one(User.employee_id == fb.manager_employee_id)
-        comments_html = [
-            {"employee_id": c["employee_id"], "text": markdown2.markdown(c["text"])}
-            for c in getattr(fb, "comments", [])
-        ]
-        out.append(FeedbackOut.from_feedback(
+        mgr = managers.get(fb.manager_employee_id)
+        out.append(FeedbackOut.dump_feedback(
             fb,
             mgr.name if mgr else "Unknown",
-            comments_html
+            comments_for_display(fb.comments)
         ))
-    return out
+    return fast_json(out, response)
 
 
 # -----------------------------
 # Acknowledge Feedback
 # -----------------------------
 @router.patch("/acknowledge/{feedback_id}")
-async def acknowledge(feedback_id: str):
-    fb = await Feedback.get(feedback_id)
-    if not fb:
-        raise HTTPException(404, "Feedback not found")
-
-    fb.acknowledged = True
-    await fb.save()
+async def acknowledge(
+    feedback_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    fb = await update_or_raise(
+        Feedback,
+        feedback_id,
+        {"$set": {"acknowledged": True}},
+        "Feedback not found",
+        conditions={"employee_id": principal.employee_id} if principal else None,
+        projection={"employee_id": 1, "manager_employee_id": 1}
+    )
+    await versioning.bump(
+        versioning.employee_scope(fb["employee_id"]),
+        versioning.manager_scope(fb["manager_employee_id"])
+    )
 
-    mgr = await User.find_one(User.employee_id == fb.manager_employee_id)
+    mgr = await user_directory.get(fb["manager_employee_id"])
     if mgr:
-        await Notification(
-            employee_id=fb.manager_employee_id,
-            manager_employee_id=fb.manager_employee_id,
+        notify(Notification(
+            employee_id=fb["manager_employee_id"],
+            manager_employee_id=fb["manager_employee_id"],
             manager_name=mgr.name,
-            message=f"Employee {fb.employee_id} acknowledged your feedback."
-        ).insert()
+            message=f"Employee {fb['employee_id']} acknowledged your feedback."
+        ))
 
     return {"message": "Feedback acknowledged"}
 
@@ -207,45 +370,66 @@ async def acknowledge(feedback_id: str):
 # Update Feedback (Manager only)
 # -----------------------------
 @router.put("/{feedback_id}", response_model=FeedbackOut)
-async def update_feedback(feedback_id: str, upd: FeedbackCreate):
-    fb = await Feedback.get(feedback_id)
-    if not fb:
-        raise HTTPException(404, "Feedback not found")
-
-    mgr = await User.find_one(
-        User.employee_id == upd.manager_employee_id,
-        User.role == "manager"
-    )
-    if not mgr or fb.manager_employee_id != mgr.employee_id:
+async def update_feedback(
+    feedback_id: str,
+    upd: FeedbackCreate,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, upd.manager_employee_id, "manager")
+    if not mgr:
         raise HTTPException(403, "Not authorized")
 
-    fb.strengths = upd.strengths
-    fb.improvement = upd.improvement
-    fb.sentiment = upd.sentiment
-    fb.tags = upd.tags or []
-    fb.anonymous = upd.anonymous
-    await fb.save()
+    changes = {
+        "strengths": upd.strengths,
+        "improvement": upd.improvement,
+        "sentiment": upd.sentiment,
+        "tags": upd.tags or [],
+        "anonymous": upd.anonymous,
+        "updated_at": datetime.utcnow(),
+    }
+    # The ownership check is part of the update filter; the old document
+    # is returned so the sentiment rollups can move the feedback
+    before = await update_or_raise(
+        Feedback,
+        feedback_id,
+        {"$set": changes},
+        "Feedback not found",
+        conditions={"manager_employee_id": mgr.employee_id},
+        return_document=ReturnDocument.BEFORE
+    )
+    doc = {**before, **changes}
+    await sentiment_rollups.change_sentiment(before, doc)
+    await versioning.bump_feedback([doc["employee_id"]], mgr.employee_id)
 
-    return FeedbackOut.from_feedback(fb, mgr.name)
+    return FeedbackOut.from_feedback(Feedback.model_validate(doc), mgr.name)
 
 
 # -----------------------------
 # Delete Feedback
 # -----------------------------
 @router.delete("/{feedback_id}")
-async def delete_feedback(feedback_id: str):
+async def delete_feedback(
+    feedback_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
     fb = await Feedback.get(feedback_id)
     if not fb:
         raise HTTPException(404, "Feedback not found")
 
-    mgr = await User.find_one(
-        User.employee_id == fb.manager_employee_id,
-        User.role == "manager"
-    )
+    mgr = await resolve_caller(principal, fb.manager_employee_id, "manager")
     if not mgr:
         raise HTTPException(403, "Not authorized")
 
-    await fb.delete()
+    # Only the request that actually deleted it updates the rollups
+    deleted = await Feedback.get_motor_collection().find_one_and_delete(
+        {"_id": fb.id},
+        projection={"manager_employee_id": 1, "employee_id": 1, "sentiment": 1, "created_at": 1}
+    )
+    if not deleted:
+        raise HTTPException(404, "Feedback not found")
+    await sentiment_rollups.apply([deleted], -1)
+    await comment_store.delete_comments([fb.id])
+    await versioning.bump_feedback([fb.employee_id], fb.manager_employee_id)
     return {"message": "Deleted"}
 
 
@@ -253,17 +437,27 @@ async def delete_feedback(feedback_id: str):
 # Delete All Feedback by Manager
 # -----------------------------
 @router.delete("/manager/{manager_id}")
-async def delete_all(manager_id: str):
-    mgr = await User.find_one(
-        User.employee_id == manager_id,
-        User.role == "manager"
-    )
+async def delete_all(
+    manager_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
     if not mgr:
         raise HTTPException(403, "Not authorized")
 
+    feedback_ids = await Feedback.get_motor_collection().distinct(
+        "_id", {"manager_employee_id": manager_id}
+    )
+    employee_ids = await Feedback.get_motor_collection().distinct(
+        "employee_id", {"manager_employee_id": manager_id}
+    )
     deleted = await Feedback.find(
         Feedback.manager_employee_id == manager_id
     ).delete()
+    await comment_store.delete_comments(feedback_ids)
+    # Rollups are keyed by the authoring manager, so all of theirs go too
+    await sentiment_rollups.remove_manager(manager_id)
+    await versioning.bump_feedback(employee_ids, manager_id)
     return {"message": f"Deleted {deleted} items"}
 
 
@@ -271,126 +465,247 @@ async def delete_all(manager_id: str):
 # Add Comment to Feedback
 # -----------------------------
 @router.post("/comment/{feedback_id}")
-async def comment(feedback_id: str, comment: CommentIn):
-    fb = await Feedback.get(feedback_id)
-    if not fb:
-        raise HTTPException(404, "Feedback not found")
-
-    emp = await User.find_one(User.employee_id == comment.employee_id)
+async def comment(
+    feedback_id: str,
+    comment: CommentIn,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    emp = await resolve_caller(principal, comment.employee_id)
     if not emp or emp.role != "employee":
         raise HTTPException(403, "Not authorized")
 
-    fb.comments = getattr(fb, "comments", [])
-    fb.comments.append({
-        "employee_id": comment.employee_id,
-        "text": comment.text
-    })
-    await fb.save()
+    try:
+        fb = await comment_store.append_comment(
+            ObjectId(feedback_id), comment.employee_id, comment.text
+        )
+    except InvalidId:
+        fb = None
+    if not fb:
+        raise HTTPException(404, "Feedback not found")
+    await versioning.bump(
+        versioning.employee_scope(fb["employee_id"]),
+        versioning.manager_scope(fb["manager_employee_id"])
+    )
 
-    mgr = await User.find_one(User.employee_id == fb.manager_employee_id)
+    mgr = await user_directory.get(fb["manager_employee_id"])
     if mgr:
-        await Notification(
-            employee_id=fb.manager_employee_id,
-            manager_employee_id=fb.manager_employee_id,
+        notify(Notification(
+            employee_id=fb["manager_employee_id"],
+            manager_employee_id=fb["manager_employee_id"],
             manager_name=mgr.name,
             message=f"Employee {comment.employee_id} commented on your feedback."
-        ).insert()
+        ))
 
     return {"message": "Comment added"}
 
 
+# -----------------------------
+# List Comments of a Feedback (paginated)
+# -----------------------------
+@router.get("/comment/{feedback_id}")
+async def get_comments(
+    feedback_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+):
+    try:
+        feedback_oid = ObjectId(feedback_id)
+    except InvalidId:
+        raise HTTPException(404, "Feedback not found")
+
+    comments, next_cursor = await fetch_page(
+        Comment.find(Comment.feedback_id == feedback_oid), page
+    )
+    set_next_cursor(response, next_cursor)
+    return fast_json([comment_store.comment_payload(c) for c in comments], response)
+
+
 # -----------------------------
 # Export Feedback as PDF
 # -----------------------------
 @router.get("/export/{employee_id}", response_model=ExportPDFResponse)
 async def export_pdf(employee_id: str):
-    fbs = await Feedback.find(Feedback.employee_id == employee_id).to_list()
-    buf = io.BytesIO()
-    p = canvas.Canvas(buf)
-    p.drawString(100, 800, f"Feedback Report for Employee ID: {employee_id}")
-    y = 780
-    for fb in fbs:
-        p.drawString(
-            100,
-            y,
-            f"{fb.sentiment.upper()} - {fb.strengths} | {fb.improvement}"
-        )
-        y -= 20
-        if y < 50:
-            p.showPage()
-            y = 800
-    p.save()
-    buf.seek(0)
-    return StreamingResponse(buf, media_type="application/pdf")
+    pdf = await pdf_report.get_report(employee_id)
+    return StreamingResponse(
+        pdf_report.iter_chunks(pdf),
+        media_type="application/pdf",
+        headers={"Content-Length": str(len(pdf))}
+    )
 
 
 # -----------------------------
-# View Feedback History (Manager)
+# Export every direct report's feedback as a ZIP of PDFs
 # -----------------------------
-@router.get("/manager/{manager_id}", response_model=List[FeedbackOut])
-async def get_manager_feedback_history(manager_id: str):
-    mgr = await User.find_one(
-        User.employee_id == manager_id,
-        User.role == "manager"
+@router.get("/export/manager/{manager_id}")
+async def export_team_pdfs(
+    manager_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
+    if not mgr:
+        raise HTTPException(404, "Manager not found")
+
+    employees = await User.find(
+        User.manager_employee_id == manager_id
+    ).project(EmployeeId).to_list()
+    return StreamingResponse(
+        pdf_report.stream_team_archive(emp.employee_id for emp in employees),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="feedback_team_{manager_id}.zip"'
+        }
     )
+
+
+# -----------------------------
+# View Feedback History (Manager)
+# -----------------------------
+@router.get(
+    "/manager/{manager_id}",
+    response_model=List[FeedbackOut],
+    dependencies=[Depends(dashboard_reads)],
+)
+async def get_manager_feedback_history(
+    manager_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    tag: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
     if not mgr:
         raise HTTPException(404, "Manager not found")
 
-    fbs = await Feedback.find(
-        Feedback.manager_employee_id == manager_id
-    ).to_list()
+    not_modified = await versioning.check_etag(
+        request, response, versioning.manager_scope(manager_id)
+    )
+    if not_modified:
+        return not_modified
+
+    query = Feedback.find(Feedback.manager_employee_id == manager_id)
+    if tag:
+        query = query.find(Feedback.tags == tag)
+    fbs, next_cursor = await fetch_page(query.project(FeedbackView), page)
+    set_next_cursor(response, next_cursor)
 
     out = []
     for fb in fbs:
-        comments_html = [
-            {"employee_id": c["employee_id"], "text": markdown2.markdown(c["text"])}
-            for c in getattr(fb, "comments", [])
-        ]
         out.append(
-            FeedbackOut.from_feedback(
+            FeedbackOut.dump_feedback(
                 fb,
                 mgr.name,
-                comments_html
+                comments_for_display(fb.comments)
             )
         )
-    return out
+    return fast_json(out, response)
+
+
+# -----------------------------
+# Sentiment Trends
+# -----------------------------
+@router.get("/trends/manager/{manager_id}", dependencies=[Depends(dashboard_reads)])
+async def get_team_trends(
+    manager_id: str,
+    request: Request,
+    response: Response,
+    period: Literal["week", "month"] = "week",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    employee_id: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
+    if not mgr:
+        raise HTTPException(404, "Manager not found")
+
+    not_modified = await versioning.check_etag(
+        request, response, versioning.manager_scope(manager_id)
+    )
+    if not_modified:
+        return not_modified
+
+    match = {"manager_employee_id": manager_id}
+    if employee_id:
+        match["employee_id"] = employee_id
+    series = await sentiment_rollups.trends(match, period, since, until)
+    return fast_json(series, response)
+
+
+@router.get("/trends/employee/{employee_id}", dependencies=[Depends(dashboard_reads)])
+async def get_employee_trends(
+    employee_id: str,
+    request: Request,
+    response: Response,
+    period: Literal["week", "month"] = "week",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    emp = await resolve_caller(principal, employee_id, "employee", allow_manager=True)
+    if not emp:
+        raise HTTPException(404, "Employee not found")
+
+    not_modified = await versioning.check_etag(
+        request, response, versioning.employee_scope(employee_id)
+    )
+    if not_modified:
+        return not_modified
+
+    series = await sentiment_rollups.trends({"employee_id": employee_id}, period, since, until)
+    return fast_json(series, response)
+
+
+# -----------------------------
+# Team Tags
+# -----------------------------
+@router.get("/tags/manager/{manager_id}", dependencies=[Depends(dashboard_reads)])
+async def get_team_tags(
+    manager_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=500),
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    mgr = await resolve_caller(principal, manager_id, "manager")
+    if not mgr:
+        raise HTTPException(404, "Manager not found")
+
+    not_modified = await versioning.check_etag(
+        request, response, versioning.manager_scope(manager_id)
+    )
+    if not_modified:
+        return not_modified
+
+    version = versioning.request_version(request, versioning.manager_scope(manager_id))
+    return fast_json(await tag_analytics.team_tags(manager_id, limit, version), response)
 
 
 # -------------------------------
 # Notifications
 # -------------------------------
 @router.get("/notifications/{employee_id}")
-async def get_notifications(employee_id: str):
-    notifs = await Notification.find(
-        Notification.employee_id == employee_id
-    ).sort(-Notification.created_at).to_list()
-    return [
-        {
-            "id": str(n.id),
-            "employee_id": n.employee_id,
-            "manager_employee_id": n.manager_employee_id,
-            "manager_name": n.manager_name,
-            "message": n.message,
-            "seen": n.seen,
-            "created_at": n.created_at,
-        }
-        for n in notifs
-    ]
+async def get_notifications(
+    employee_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+):
+    notifs, next_cursor = await fetch_page(
+        Notification.find(Notification.employee_id == employee_id), page
+    )
+    set_next_cursor(response, next_cursor)
+    return fast_json([notification_payload(n) for n in notifs], response)
 
 
 @router.patch("/notifications/{notification_id}")
 async def update_notification_seen(notification_id: str, seen: bool):
-    notif = await Notification.get(notification_id)
-    if not notif:
+    found = await unread_counters.set_notification_seen(notification_id, seen)
+    if not found:
         raise HTTPException(404, "Notification not found")
-    notif.seen = seen
-    await notif.save()
     return {"message": "Notification updated"}
 
 
 @router.patch("/notifications/mark-all-seen/{employee_id}")
 async def mark_all_seen(employee_id: str):
-    await Notification.find(
-        Notification.employee_id == employee_id
-    ).update_many({"$set": {"seen": True}})
+    await unread_counters.mark_all_notifications_seen(employee_id)
     return {"message": "All notifications marked as seen"}
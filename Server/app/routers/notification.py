@@ -1,28 +1,97 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import os
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response, Request, Query, Header
+from fastapi.responses import StreamingResponse
 from app.models.notification import Notification
 from bson import ObjectId
+from bson.errors import InvalidId
+from app.utils.pagination import PageParams, fetch_page, set_next_cursor
+from app.utils.notification_hub import notification_hub, format_event
+from app.utils import unread_counters
+from app.utils.responses import fast_json
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+SSE_REPLAY_LIMIT = int(os.getenv("SSE_REPLAY_LIMIT", 500))
+
 @router.get("/notifications/{employee_id}")
-async def get_notifications(employee_id: str):
-    notifications = await Notification.find(
-        Notification.employee_id == employee_id
-    ).sort(-Notification.created_at).to_list()
-    return notifications
+async def get_notifications(
+    employee_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+):
+    notifications, next_cursor = await fetch_page(
+        Notification.find(Notification.employee_id == employee_id), page
+    )
+    set_next_cursor(response, next_cursor)
+    return fast_json(
+        [n.model_dump(mode="json", by_alias=True) for n in notifications], response
+    )
 
 @router.patch("/notifications/{notification_id}")
 async def mark_seen(notification_id: str, seen: bool):
-    notif = await Notification.get(ObjectId(notification_id))
-    if not notif:
+    found = await unread_counters.set_notification_seen(notification_id, seen)
+    if not found:
         raise HTTPException(status_code=404, detail="Notification not found.")
-    notif.seen = seen
-    await notif.save()
     return {"message": "Notification updated."}
 
 @router.patch("/notifications/mark-all-seen/{employee_id}")
 async def mark_all_seen(employee_id: str):
-    await Notification.find(
-        Notification.employee_id == employee_id
-    ).update_many({"$set": {"seen": True}})
+    await unread_counters.mark_all_notifications_seen(employee_id)
     return {"message": "All notifications marked as seen."}
+
+@router.get("/badge/{employee_id}")
+async def get_badge_counts(employee_id: str):
+    return await unread_counters.get_counts(employee_id)
+
+# -------------------------------
+# Live notifications (Server-Sent Events)
+# -------------------------------
+@router.get("/stream/{employee_id}")
+async def stream_notifications(
+    employee_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Query(None, description="Resume after this notification id"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    resume_after = last_event_id or last_event_id_header
+    if resume_after:
+        try:
+            resume_after = ObjectId(resume_after)
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid last event id.")
+
+    # Subscribe before replaying so nothing published in between is lost
+    queue = notification_hub.subscribe(employee_id)
+
+    async def events():
+        try:
+            replayed = set()
+            if resume_after:
+                missed = await Notification.find(
+                    Notification.employee_id == employee_id,
+                    {"_id": {"$gt": resume_after}}
+                ).sort("_id").limit(SSE_REPLAY_LIMIT).to_list()
+                for n in missed:
+                    if n.id not in replayed:
+                        replayed.add(n.id)
+                        yield format_event(n)
+
+            while not await request.is_disconnected():
+                try:
+                    n = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if n.id not in replayed:
+                    yield format_event(n)
+        finally:
+            notification_hub.unsubscribe(employee_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response, Request
+from pymongo.errors import DuplicateKeyError
 from app.models.user import User
 from app.models.feedback import Feedback
+from app.models.projections import FeedbackSummary
+from app.utils.user_directory import user_directory
+from app.auth.dependencies import get_optional_principal, principal_claims, resolve_caller
+from app.auth.jwt import create_access_token
+from app.utils.pagination import PageParams, fetch_page, set_next_cursor
 from app.schemas.user import (
     UserCreate,
     UserOut,
@@ -8,13 +14,16 @@ from app.schemas.user import (
     PasswordUpdate,
     PasswordReset,
     UserUpdate,  # Keep as is
+    Principal,
 )
-from typing import List
-from collections import Counter
-from passlib.context import CryptContext
+from typing import List, Literal, Optional
+from app.auth.hash import password_hasher
+from app.utils.user_import import UserImport, iter_rows
+from app.utils.responses import fast_json
+from app.utils import versioning
+from app.db.routing import dashboard_reads
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 # -------------------------------
@@ -32,15 +41,22 @@ async def create_user(user: UserCreate):
                 status_code=400, detail="manager_employee_id required for employees."
             )
 
-        manager = await User.find_one(User.employee_id == user.manager_employee_id)
-        if not manager or manager.role != "manager":
+        manager = await user_directory.get_with_role(user.manager_employee_id, "manager")
+        if not manager:
             raise HTTPException(status_code=404, detail="Manager not found.")
 
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
 
     new_user = User(**user.dict())
     new_user.password = hashed_password
-    await new_user.insert()
+    try:
+        await new_user.insert()
+    except DuplicateKeyError:
+        # A concurrent registration for the same id won the unique index
+        raise HTTPException(status_code=400, detail="Employee ID already exists.")
+    user_directory.invalidate(new_user.employee_id)
+    if new_user.manager_employee_id:
+        await versioning.bump(versioning.manager_scope(new_user.manager_employee_id))
 
     return UserOut(
         name=new_user.name,
@@ -51,17 +67,36 @@ async def create_user(user: UserCreate):
     )
 
 
+# -------------------------------
+# Bulk import users (CSV or NDJSON)
+# -------------------------------
+@router.post("/bulk")
+async def bulk_import_users(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, description="Defaults to the request Content-Type"
+    ),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    return await UserImport().run(iter_rows(request.stream(), format))
+
+
 # -------------------------------
 # User Login
 # -------------------------------
 @router.post("/login")
 async def login_user(credentials: UserLogin):
     user = await User.find_one(User.employee_id == credentials.employee_id)
-    if not user or not pwd_context.verify(credentials.password, user.password):
+    if not user or not await password_hasher.verify(credentials.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
     return {
         "message": "Login successful.",
+        "access_token": create_access_token(principal_claims(user)),
+        "token_type": "bearer",
         "name": user.name,
         "email": user.email,
         "role": user.role,
@@ -73,54 +108,102 @@ async def login_user(credentials: UserLogin):
 # -------------------------------
 # Manager Dashboard
 # -------------------------------
-@router.get("/dashboard/manager/{manager_id}", response_model=List[dict])
-async def manager_dashboard(manager_id: str):
-    manager = await User.find_one(User.employee_id == manager_id)
-    if not manager or manager.role != "manager":
+@router.get(
+    "/dashboard/manager/{manager_id}",
+    response_model=List[dict],
+    dependencies=[Depends(dashboard_reads)],
+)
+async def manager_dashboard(
+    manager_id: str,
+    request: Request,
+    response: Response,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    manager = await resolve_caller(principal, manager_id, "manager")
+    if not manager:
         raise HTTPException(status_code=404, detail="Manager not found.")
 
-    employees = await User.find(User.manager_employee_id == manager_id).to_list()
+    not_modified = await versioning.check_etag(
+        request, response, versioning.manager_scope(manager_id)
+    )
+    if not_modified:
+        return not_modified
+
+    # One aggregation: each employee under the manager joined with their
+    # feedback sentiment counts, grouped server-side.
+    pipeline = [
+        {"$project": {"employee_id": 1, "name": 1}},
+        {
+            "$lookup": {
+                "from": Feedback.Settings.name,
+                "let": {"employee_id": "$employee_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$employee_id", "$$employee_id"]}}},
+                    {"$project": {"sentiment": 1}},
+                    {"$group": {"_id": "$sentiment", "count": {"$sum": 1}}},
+                ],
+                "as": "sentiments",
+            }
+        },
+        {"$project": {"_id": 0, "employee_id": 1, "name": 1, "sentiments": 1}},
+    ]
+    employees = await User.find(
+        User.manager_employee_id == manager_id
+    ).aggregate(pipeline).to_list()
 
     result = []
     for emp in employees:
-        feedbacks = await Feedback.find(
-            Feedback.employee_id == emp.employee_id
-        ).to_list()
-
-        sentiments = Counter([fb.sentiment for fb in feedbacks])
-
+        sentiments = {s["_id"]: s["count"] for s in emp["sentiments"]}
         result.append(
             {
-                "employee_id": emp.employee_id,
-                "employee_name": emp.name,
-                "feedback_count": len(feedbacks),
+                "employee_id": emp["employee_id"],
+                "employee_name": emp["name"],
+                "feedback_count": sum(sentiments.values()),
                 "positive": sentiments.get("positive", 0),
                 "neutral": sentiments.get("neutral", 0),
                 "negative": sentiments.get("negative", 0),
             }
         )
 
-    return result
+    return fast_json(result, response)
 
 
 # -------------------------------
 # Employee Dashboard
 # -------------------------------
-@router.get("/dashboard/employee/{employee_id}", response_model=List[dict])
-async def employee_dashboard(employee_id: str):
-    user = await User.find_one(User.employee_id == employee_id)
-    if not user or user.role != "employee":
+@router.get(
+    "/dashboard/employee/{employee_id}",
+    response_model=List[dict],
+    dependencies=[Depends(dashboard_reads)],
+)
+async def employee_dashboard(
+    employee_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    user = await resolve_caller(principal, employee_id, "employee", allow_manager=True)
+    if not user:
         raise HTTPException(status_code=404, detail="Employee not found.")
 
-    feedbacks = (
-        await Feedback.find(Feedback.employee_id == employee_id)
-        .sort("-created_at")
-        .to_list()
+    not_modified = await versioning.check_etag(
+        request, response, versioning.employee_scope(employee_id)
     )
+    if not_modified:
+        return not_modified
+
+    feedbacks, next_cursor = await fetch_page(
+        Feedback.find(Feedback.employee_id == employee_id).project(FeedbackSummary),
+        page
+    )
+    set_next_cursor(response, next_cursor)
+
+    managers = await user_directory.get_many(fb.manager_employee_id for fb in feedbacks)
 
     timeline = []
     for fb in feedbacks:
-        manager = await User.find_one(User.employee_id == fb.manager_employee_id)
+        manager = managers.get(fb.manager_employee_id)
         timeline.append(
             {
                 "feedback_id": str(fb.id),
@@ -134,39 +217,37 @@ async def employee_dashboard(employee_id: str):
             }
         )
 
-    return timeline
+    return fast_json(timeline, response)
 
 
 # -------------------------------
 # Get employees under a manager
 # -------------------------------
 @router.get("/manager/{manager_id}/employees", response_model=List[UserOut])
-async def get_employees_under_manager(manager_id: str):
-    manager = await User.find_one(User.employee_id == manager_id)
-    if not manager or manager.role != "manager":
+async def get_employees_under_manager(
+    manager_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    manager = await resolve_caller(principal, manager_id, "manager")
+    if not manager:
         raise HTTPException(status_code=404, detail="Manager not found.")
 
-    employees = await User.find(User.manager_employee_id == manager_id).to_list()
-
-    return [
-        UserOut(
-            name=emp.name,
-            email=emp.email,
-            role=emp.role,
-            employee_id=emp.employee_id,
-            manager_employee_id=emp.manager_employee_id,
-        )
-        for emp in employees
-    ]
+    return await User.find(
+        User.manager_employee_id == manager_id
+    ).project(UserOut).to_list()
 
 
 # -------------------------------
 # Delete employee - Manager Only
 # -------------------------------
 @router.delete("/{manager_id}/{employee_id}")
-async def delete_employee(manager_id: str, employee_id: str):
-    manager = await User.find_one(User.employee_id == manager_id)
-    if not manager or manager.role != "manager":
+async def delete_employee(
+    manager_id: str,
+    employee_id: str,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    manager = await resolve_caller(principal, manager_id, "manager")
+    if not manager:
         raise HTTPException(status_code=403, detail="Only managers can delete employees.")
 
     employee = await User.find_one(User.employee_id == employee_id)
@@ -180,6 +261,10 @@ async def delete_employee(manager_id: str, employee_id: str):
         )
 
     await employee.delete()
+    user_directory.invalidate(employee_id)
+    await versioning.bump(
+        versioning.employee_scope(employee_id), versioning.manager_scope(manager_id)
+    )
     return {"message": f"Employee {employee_id} deleted successfully."}
 
 
@@ -187,9 +272,14 @@ async def delete_employee(manager_id: str, employee_id: str):
 # Update employee - Manager Only
 # -------------------------------
 @router.put("/{manager_id}/{employee_id}")
-async def update_employee(manager_id: str, employee_id: str, update_data: UserUpdate):
-    manager = await User.find_one(User.employee_id == manager_id)
-    if not manager or manager.role != "manager":
+async def update_employee(
+    manager_id: str,
+    employee_id: str,
+    update_data: UserUpdate,
+    principal: Optional[Principal] = Depends(get_optional_principal),
+):
+    manager = await resolve_caller(principal, manager_id, "manager")
+    if not manager:
         raise HTTPException(status_code=403, detail="Only managers can update employees.")
 
     employee = await User.find_one(User.employee_id == employee_id)
@@ -205,11 +295,18 @@ async def update_employee(manager_id: str, employee_id: str, update_data: UserUp
     updates = update_data.dict(exclude_unset=True)
 
     if "password" in updates and updates["password"]:
-        updates["password"] = pwd_context.hash(updates["password"])
+        updates["password"] = await password_hasher.hash(updates["password"])
     elif "password" in updates and not updates["password"]:
         updates.pop("password")
 
     await employee.set(updates)
+    user_directory.invalidate(employee_id)
+    await versioning.bump(
+        versioning.employee_scope(employee_id),
+        versioning.manager_scope(manager_id),
+        versioning.manager_scope(updates["manager_employee_id"])
+        if updates.get("manager_employee_id") else None
+    )
 
     return {"message": f"Employee {employee_id} updated successfully."}
 
@@ -223,11 +320,12 @@ async def change_password(employee_id: str, data: PasswordUpdate):
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    if not pwd_context.verify(data.old_password, user.password):
+    if not await password_hasher.verify(data.old_password, user.password):
         raise HTTPException(status_code=401, detail="Old password is incorrect.")
 
-    new_hashed = pwd_context.hash(data.new_password)
+    new_hashed = await password_hasher.hash(data.new_password)
     await user.set({"password": new_hashed})
+    user_directory.invalidate(employee_id)
 
     return {"message": "Password updated successfully."}
 
@@ -241,7 +339,8 @@ async def forgot_password(employee_id: str, data: PasswordReset):
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    new_hashed = pwd_context.hash(data.new_password)
+    new_hashed = await password_hasher.hash(data.new_password)
     await user.set({"password": new_hashed})
+    user_directory.invalidate(employee_id)
 
     return {"message": "Password reset successfully."}
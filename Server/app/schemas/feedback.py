@@ -2,15 +2,31 @@ from pydantic import BaseModel
 from typing import Literal, List, Optional
 from datetime import datetime
 
+Sentiment = Literal["positive", "neutral", "negative"]
+
 class FeedbackCreate(BaseModel):
     manager_employee_id: str
     employee_id: str
     strengths: str
     improvement: str
-    sentiment: str
+    sentiment: Sentiment
+    anonymous: Optional[bool] = False
+    tags: Optional[List[str]] = []
+
+class FeedbackTemplate(BaseModel):
+    strengths: str
+    improvement: str
+    sentiment: Sentiment
     anonymous: Optional[bool] = False
     tags: Optional[List[str]] = []
 
+class FeedbackBulkCreate(BaseModel):
+    manager_employee_id: str
+    # Either individual items, or one template sent to every employee_id
+    items: List[FeedbackCreate] = []
+    template: Optional[FeedbackTemplate] = None
+    employee_ids: List[str] = []
+
 class CommentIn(BaseModel):
     employee_id: str
     text: str
@@ -31,25 +47,32 @@ class FeedbackOut(BaseModel):
     anonymous: bool
     tags: List[str]
     comments: List[dict]
+    comment_count: int = 0
     acknowledged: bool
     created_at: datetime
 
     @classmethod
     def from_feedback(cls, fb, manager_name, comments_html=None):
-        return cls(
-            id=str(fb.id),
-            manager_employee_id=fb.manager_employee_id,
-            manager_name=manager_name,
-            employee_id=fb.employee_id,
-            strengths=fb.strengths,
-            improvement=fb.improvement,
-            sentiment=fb.sentiment,
-            anonymous=fb.anonymous,
-            tags=fb.tags,
-            comments=comments_html if comments_html is not None else fb.comments,
-            acknowledged=fb.acknowledged,
-            created_at=fb.created_at
-        )
+        return cls(**cls.dump_feedback(fb, manager_name, comments_html))
+
+    @staticmethod
+    def dump_feedback(fb, manager_name, comments_html=None) -> dict:
+        # Plain-dict form for the fast JSON path; fb comes from a validated model
+        return {
+            "id": str(fb.id),
+            "manager_employee_id": fb.manager_employee_id,
+            "manager_name": manager_name,
+            "employee_id": fb.employee_id,
+            "strengths": fb.strengths,
+            "improvement": fb.improvement,
+            "sentiment": fb.sentiment,
+            "anonymous": fb.anonymous,
+            "tags": fb.tags,
+            "comments": comments_html if comments_html is not None else fb.comments,
+            "comment_count": max(fb.comment_count, len(fb.comments)),
+            "acknowledged": fb.acknowledged,
+            "created_at": fb.created_at,
+        }
 
 class ExportPDFResponse(BaseModel):
     pass  # handled via StreamingResponse
@@ -41,3 +41,12 @@ class UserUpdate(BaseModel):
     password: Optional[str]     
     role: Optional[Literal["manager", "employee"]]
     manager_employee_id: Optional[str]
+
+# -----------------------------
+# Authenticated caller, decoded from the access token
+# -----------------------------
+class Principal(BaseModel):
+    employee_id: str
+    name: str
+    role: Literal["manager", "employee"]
+    manager_employee_id: Optional[str] = None
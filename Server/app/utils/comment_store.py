@@ -0,0 +1,121 @@
+"""Feedback comments.
+
+Every comment lives in the ``comments`` collection keyed by ``feedback_id``.
+The feedback document itself only keeps a ``comment_count`` and the latest
+``LATEST_COMMENTS`` comments, both maintained with a single atomic
+``$push``/``$slice`` + ``$inc`` so concurrent posts are never lost and the
+document stops growing. Comments embedded before this layout are moved
+into the collection when a feedback gets its next comment; run
+``python -m app.utils.comment_store`` once to move the rest.
+"""
+import asyncio
+import os
+from typing import Iterable, Optional
+
+from beanie import PydanticObjectId
+
+from app.models.comment import Comment
+from app.models.feedback import Feedback
+from app.utils.markdown_render import render_markdown
+
+LATEST_COMMENTS = int(os.getenv("LATEST_COMMENTS", 5))
+
+
+async def _push(feedback_id: PydanticObjectId, entry: dict) -> Optional[dict]:
+    # Only migrated documents: on a legacy one $slice would drop the oldest
+    # embedded comments before they were copied to the collection
+    return await Feedback.get_motor_collection().find_one_and_update(
+        {"_id": feedback_id, "comment_count": {"$exists": True}},
+        {
+            "$push": {"comments": {"$each": [entry], "$slice": -LATEST_COMMENTS}},
+            "$inc": {"comment_count": 1},
+        },
+        projection={"employee_id": 1, "manager_employee_id": 1},
+    )
+
+
+async def append_comment(
+    feedback_id: PydanticObjectId, employee_id: str, text: str
+) -> Optional[dict]:
+    """Add a comment; returns the feedback's ids, or None if it does not exist."""
+    entry = {"employee_id": employee_id, "text": text, "html": render_markdown(text)}
+    fb = await _push(feedback_id, entry)
+    if fb is None:
+        legacy = await Feedback.find_one({"_id": feedback_id, "comment_count": {"$exists": False}})
+        if legacy is None:
+            return None
+        await _migrate(legacy)
+        fb = await _push(feedback_id, entry)
+        if fb is None:
+            return None
+
+    await Comment(feedback_id=feedback_id, **entry).insert()
+    return fb
+
+def comment_payload(c: Comment) -> dict:
+    return {
+        "id": str(c.id),
+        "employee_id": c.employee_id,
+        "text": c.html,
+        "created_at": c.created_at,
+    }
+
+
+async def delete_comments(feedback_ids: Iterable[PydanticObjectId]) -> None:
+    ids = list(feedback_ids)
+    if ids:
+        await Comment.find({"feedback_id": {"$in": ids}}).delete()
+
+
+# -----------------------------
+# One-off migration of embedded comments
+# -----------------------------
+async def _migrate(fb: Feedback) -> bool:
+    """Move one feedback's embedded comments; False if another writer got there first."""
+    comments = [
+        Comment(
+            id=PydanticObjectId(),
+            feedback_id=fb.id,
+            employee_id=c["employee_id"],
+            text=c["text"],
+            html=c.get("html") or render_markdown(c["text"]),
+            created_at=fb.created_at,
+        )
+        for c in fb.comments
+    ]
+    if comments:
+        await Comment.insert_many(comments)
+    # Guarded on the list we copied, so a comment posted meanwhile is not lost
+    result = await Feedback.get_motor_collection().update_one(
+        {"_id": fb.id, "comment_count": {"$exists": False}, "comments": fb.comments},
+        {"$set": {
+            "comment_count": len(fb.comments),
+            "comments": fb.comments[-LATEST_COMMENTS:],
+        }},
+    )
+    if result.modified_count == 0:
+        # Already migrated (e.g. by a concurrent append_comment): drop our copies
+        if comments:
+            await Comment.find({"_id": {"$in": [c.id for c in comments]}}).delete()
+        return False
+    return True
+
+
+async def migrate_embedded_comments(batch_size: int = 500) -> int:
+    migrated = 0
+    query = Feedback.find({"comment_count": {"$exists": False}}, batch_size=batch_size)
+    async for fb in query:
+        migrated += await _migrate(fb)
+    return migrated
+
+
+async def _main() -> None:
+    from app.db.mongo import init_db
+
+    await init_db()
+    migrated = await migrate_embedded_comments()
+    print(f"Moved embedded comments of {migrated} feedback documents.")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
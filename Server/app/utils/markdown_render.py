@@ -0,0 +1,82 @@
+"""Comment Markdown rendering.
+
+Comments are rendered once when they are posted and the HTML is stored next
+to the raw text under ``html``. Rows written before that have no ``html``;
+reads render them through a content-hash LRU until the backfill
+(``python -m app.utils.markdown_render``) has been run.
+"""
+import asyncio
+import hashlib
+import os
+from typing import Dict, Iterable, List
+
+import markdown2
+
+from app.models.feedback import Feedback
+from app.utils.cache import TTLCache
+
+COMMENT_HTML_CACHE_SIZE = int(os.getenv("COMMENT_HTML_CACHE_SIZE", 4096))
+
+# sha256(text) -> html
+_rendered = TTLCache(maxsize=COMMENT_HTML_CACHE_SIZE)
+
+
+def render_markdown(text: str) -> str:
+    return markdown2.markdown(text)
+
+
+def comment_html(comment: Dict[str, str]) -> str:
+    html = comment.get("html")
+    if html is not None:
+        return html
+
+    key = hashlib.sha256(comment["text"].encode()).hexdigest()
+    html = _rendered.get(key)
+    if html is None:
+        html = render_markdown(comment["text"])
+        _rendered.set(key, html)
+    return html
+
+
+def comments_for_display(comments: Iterable[Dict[str, str]]) -> List[dict]:
+    return [
+        {"employee_id": c["employee_id"], "text": comment_html(c)}
+        for c in comments
+    ]
+
+
+def render_cache_stats() -> dict:
+    return _rendered.stats()
+
+
+async def backfill_comment_html(batch_size: int = 500) -> int:
+    """Store rendered HTML on every comment that does not have it yet."""
+    updated = 0
+    query = Feedback.find(
+        {"comments": {"$elemMatch": {"html": {"$exists": False}}}},
+        batch_size=batch_size,
+    )
+    async for fb in query:
+        comments = [
+            {**c, "html": c.get("html") or render_markdown(c["text"])}
+            for c in fb.comments
+        ]
+        # Only write if no comment was added since we read the document
+        result = await Feedback.get_motor_collection().update_one(
+            {"_id": fb.id, "comments": fb.comments},
+            {"$set": {"comments": comments}},
+        )
+        updated += result.modified_count
+    return updated
+
+
+async def _main() -> None:
+    from app.db.mongo import init_db
+
+    await init_db()
+    updated = await backfill_comment_html()
+    print(f"Rendered comment HTML for {updated} feedback documents.")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,259 @@
+"""Request and Mongo command metrics in Prometheus text format.
+
+:class:`MetricsMiddleware` is a plain ASGI middleware (no per-request task
+or body buffering) that records latency per route template, status counts
+and in-flight requests. :class:`CommandMetrics` is a pymongo command
+listener recording latency and returned/affected document counts per
+collection and operation. Both only bump counters in memory, so they can
+stay on permanently; ``GET /metrics`` renders them for the current worker.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.models.comment import Comment
+from app.models.feedback import Feedback
+from app.models.feedback_request import FeedbackRequest
+from app.models.notification import Notification
+from app.models.sentiment_rollup import SentimentRollup
+from app.models.unread_counter import UnreadCounter
+from app.models.user import User
+from app.models.version_stamp import VersionStamp
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Commands on other collections (and admin commands) are not recorded
+TRACKED_COLLECTIONS = {
+    model.Settings.name for model in (
+        User, Feedback, FeedbackRequest, Notification, Comment, UnreadCounter,
+        VersionStamp, SentimentRollup,
+    )
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (last one is +Inf), then sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels, amount: int = 1) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value)}",
+        ]
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+http_latency = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template.", HTTP_BUCKETS
+)
+http_responses = CounterMetric(
+    "http_responses_total", "Responses sent, by route template and status code."
+)
+http_in_flight = Gauge("http_requests_in_flight", "Requests currently being served.")
+
+
+def route_template(scope, default: str = "unmatched") -> str:
+    """Full template of the route matched for ``scope``, e.g.
+    ``/feedback/employee/{employee_id}``, or ``default``.
+
+    Read after the app has handled the request: FastAPI stores the matched
+    route in the scope while routing. A router that is mounted rather than
+    copied into the app reports its path relative to its prefix, and the
+    prefix is added to ``root_path`` instead, so it is put back here.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path is None:
+        return default
+    root_path = scope.get("root_path", "")
+    prefix = root_path[len(scope.get("app_root_path", root_path)):]
+    return prefix + path
+
+
+class MetricsMiddleware:
+    """Records every HTTP request under its route template, e.g.
+    ``/feedback/employee/{employee_id}``, to keep label cardinality bounded.
+    Streaming responses count until their last chunk is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.value += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.value -= 1
+            labels = (("method", scope["method"]), ("route", route_template(scope)))
+            http_latency.observe(labels, elapsed)
+            http_responses.inc(labels + (("status", str(status)),))
+
+
+# -----------------------------
+# Mongo
+# -----------------------------
+mongo_latency = Histogram(
+    "mongo_command_duration_seconds", "Mongo command latency, by collection and operation.", MONGO_BUCKETS
+)
+mongo_documents = CounterMetric(
+    "mongo_command_documents_total", "Documents returned or written, by collection and operation."
+)
+mongo_failures = CounterMetric(
+    "mongo_command_failures_total", "Failed Mongo commands, by collection and operation."
+)
+
+
+def command_collection(command_name: str, command) -> Optional[str]:
+    if command_name == "getMore":
+        return command.get("collection")
+    collection = command.get(command_name)
+    return collection if isinstance(collection, str) else None
+
+
+def command_documents(command_name: str, reply) -> int:
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    if command_name == "distinct":
+        return len(reply.get("values", ()))
+    return int(reply.get("n", 0))
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """pymongo command listener; called synchronously on the driver's threads."""
+
+    def __init__(self):
+        # (connection, request id) -> (collection, operation)
+        self._started: Dict[tuple, Tuple[str, str]] = {}
+
+    def started(self, event):
+        collection = command_collection(event.command_name, event.command)
+        if collection in TRACKED_COLLECTIONS:
+            self._started[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def succeeded(self, event):
+        key = self._started.pop((event.connection_id, event.request_id), None)
+        if key is None:
+            return
+        labels = (("collection", key[0]), ("operation", key[1]))
+        mongo_latency.observe(labels, event.duration_micros / 1e6)
+        mongo_documents.inc(labels, command_documents(event.command_name, event.reply))
+
+    def failed(self, event):
+        key = self._started.pop((event.connection_id, event.request_id), None)
+        if key is None:
+            return
+        labels = (("collection", key[0]), ("operation", key[1]))
+        mongo_latency.observe(labels, event.duration_micros / 1e6)
+        mongo_failures.inc(labels)
+
+
+command_metrics = CommandMetrics()
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (
+        http_latency, http_responses, http_in_flight,
+        mongo_latency, mongo_documents, mongo_failures,
+    ):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,73 @@
+"""In-process pub/sub for notifications, consumed by the SSE stream endpoint.
+
+Each connected client gets a bounded queue; if a client falls that far
+behind, further events are dropped for it and it can catch up by
+reconnecting with its last event id. Subscribers only see notifications
+created on the same worker, so multi-worker deployments need sticky
+routing or must rely on the replay on reconnect.
+"""
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Set
+
+from app.models.notification import Notification
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", 100))
+
+
+def notification_payload(n: Notification) -> dict:
+    return {
+        "id": str(n.id),
+        "employee_id": n.employee_id,
+        "manager_employee_id": n.manager_employee_id,
+        "manager_name": n.manager_name,
+        "message": n.message,
+        "seen": n.seen,
+        "created_at": n.created_at,
+    }
+
+
+def format_event(n: Notification) -> str:
+    data = json.dumps(notification_payload(n), default=lambda v: v.isoformat())
+    return f"id: {n.id}\nevent: notification\ndata: {data}\n\n"
+
+
+class NotificationHub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, employee_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[employee_id].add(queue)
+        return queue
+
+    def unsubscribe(self, employee_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(employee_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[employee_id]
+
+    def publish(self, notification: Notification) -> None:
+        self.published += 1
+        for queue in self._subscribers.get(notification.employee_id, ()):
+            try:
+                queue.put_nowait(notification)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribed_employees": len(self._subscribers),
+            "connections": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+notification_hub = NotificationHub(SSE_QUEUE_SIZE)
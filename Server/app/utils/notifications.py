@@ -0,0 +1,195 @@
+"""Write-behind queue for notifications.
+
+Handlers call :func:`notify` and return without waiting on Mongo; the writer
+batches pending notifications into ``insert_many`` calls whenever
+``NOTIFICATION_FLUSH_SIZE`` are queued or every
+``NOTIFICATION_FLUSH_INTERVAL_MS``, and drains the queue on shutdown.
+Batches that fail because MongoDB is unreachable are put back and retried
+with a growing backoff, holding at most ``NOTIFICATION_MAX_BUFFER``.
+Ids are assigned at enqueue time. Connected clients (see
+``notification_hub``) are only sent a notification once it is stored, so
+any id they see can be acted on right away; unread counters are bumped per
+batch at the same point.
+"""
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import List, Optional, Set
+
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+from app.models.notification import Notification
+from app.utils.notification_hub import notification_hub
+from app.utils import unread_counters
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_FLUSH_SIZE = int(os.getenv("NOTIFICATION_FLUSH_SIZE", 100))
+NOTIFICATION_FLUSH_INTERVAL_MS = int(os.getenv("NOTIFICATION_FLUSH_INTERVAL_MS", 200))
+# Notifications held while MongoDB is unreachable; the oldest are dropped beyond it
+NOTIFICATION_MAX_BUFFER = int(os.getenv("NOTIFICATION_MAX_BUFFER", 10000))
+RETRY_BACKOFF_MAX_SECONDS = 30
+DUPLICATE_KEY = 11000
+
+
+class NotificationWriter:
+    def __init__(self, flush_size: int, flush_interval_ms: int, max_buffer: int = NOTIFICATION_MAX_BUFFER):
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max(self.flush_size, max_buffer)
+        # Seconds to wait before retrying after a connection failure, 0 when healthy
+        self._backoff = 0.0
+        self._buffer: List[Notification] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # One-off flushes while not started; referenced so they are not collected mid-write
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def enqueue(self, notification: Notification) -> Notification:
+        if notification.id is None:
+            notification.id = PydanticObjectId()
+        self._buffer.append(notification)
+        self._trim()
+
+        if self._task is None:
+            # Not started (e.g. a CLI script): write right away instead
+            task = asyncio.ensure_future(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        elif len(self._buffer) >= self.flush_size and not self._backoff:
+            self._wakeup.set()
+        return notification
+
+    def _trim(self) -> None:
+        excess = len(self._buffer) - self.max_buffer
+        if excess > 0:
+            del self._buffer[:excess]
+            self.failed += excess
+            logger.error("Notification buffer full, dropped the %d oldest notifications", excess)
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Let the loop finish its current write and drain, rather than cancelling
+        # it mid-insert and losing the batch it holds
+        if self._task is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks)
+        await self.flush()
+        if self._buffer:
+            self.failed += len(self._buffer)
+            logger.error("Dropping %d notifications not written before shutdown", len(self._buffer))
+            self._buffer.clear()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            if self._backoff:
+                # MongoDB was unreachable: only the stop signal cuts the wait short
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self._backoff)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while self._buffer:
+                batch = self._buffer[:self.flush_size]
+                del self._buffer[:len(batch)]
+                if not await self._write(batch):
+                    # Keep the order, and retry everything after a backoff
+                    self._buffer[:0] = batch
+                    self._trim()
+                    self.retries += 1
+                    self._backoff = min(
+                        max(self._backoff * 2, self.flush_interval, 0.1), RETRY_BACKOFF_MAX_SECONDS
+                    )
+                    return
+                self._backoff = 0.0
+
+    async def _write(self, batch: List[Notification]) -> bool:
+        """Returns False, writing nothing, if the batch should be retried."""
+        self.flushes += 1
+        written = batch
+        try:
+            await Notification.insert_many(batch, ordered=False)
+        except BulkWriteError as exc:
+            # Unordered: everything except the reported rows was written. Ids are
+            # assigned at enqueue time, so a duplicate key means a retried batch
+            # had in fact been stored by the attempt that timed out
+            failed = {
+                err["index"] for err in exc.details.get("writeErrors", [])
+                if err.get("code") != DUPLICATE_KEY
+            }
+            written = [n for i, n in enumerate(batch) if i not in failed]
+            if failed:
+                self.failed += len(failed)
+                logger.error("Failed to write %d notifications: %s", len(failed), exc.details)
+        except ConnectionFailure:
+            # Includes AutoReconnect, NetworkTimeout and ServerSelectionTimeoutError,
+            # e.g. during a failover
+            logger.warning("MongoDB unreachable, will retry %d notifications", len(batch), exc_info=True)
+            return False
+        except Exception:
+            # Retrying will not help; nothing may stop the writer loop either
+            self.failed += len(batch)
+            logger.exception("Failed to write %d notifications", len(batch))
+            return True
+
+        self.written += len(written)
+        for n in written:
+            notification_hub.publish(n)
+        try:
+            await unread_counters.increment_notifications(
+                Counter(n.employee_id for n in written if not n.seen)
+            )
+        except Exception:
+            logger.exception("Failed to update unread counters")
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "flush_size": self.flush_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+            "retries": self.retries,
+            "retry_backoff_seconds": self._backoff,
+        }
+
+
+notification_writer = NotificationWriter(NOTIFICATION_FLUSH_SIZE, NOTIFICATION_FLUSH_INTERVAL_MS)
+
+
+def notify(notification: Notification) -> Notification:
+    return notification_writer.enqueue(notification)
@@ -0,0 +1,98 @@
+import base64
+import json
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from beanie.odm.queries.find import FindMany
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query
+from pymongo import DESCENDING
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Every paginated list is ordered newest first on (created_at, _id)
+PAGE_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    # Mongo stores naive UTC datetimes
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(created_at: datetime, doc_id) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "id": str(doc_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return as_naive_utc(datetime.fromisoformat(data["t"])), PydanticObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
+        since: Optional[datetime] = Query(None, description="Only items created at or after this time"),
+        until: Optional[datetime] = Query(None, description="Only items created before this time"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.since = as_naive_utc(since) if since else None
+        self.until = as_naive_utc(until) if until else None
+
+    def filters(self) -> List[dict]:
+        filters = []
+        created_at = {}
+        if self.since:
+            created_at["$gte"] = self.since
+        if self.until:
+            created_at["$lt"] = self.until
+        if created_at:
+            filters.append({"created_at": created_at})
+
+        if self.cursor:
+            last_created_at, last_id = decode_cursor(self.cursor)
+            filters.append({
+                "$or": [
+                    {"created_at": {"$lt": last_created_at}},
+                    {"created_at": last_created_at, "_id": {"$lt": last_id}},
+                ]
+            })
+        return filters
+
+
+async def fetch_page(query: FindMany, page: PageParams) -> Tuple[list, Optional[str]]:
+    """Run ``query`` for one page; returns the items and the next cursor."""
+    items = await (
+        query.find(*page.filters())
+        .sort(PAGE_SORT)
+        .limit(page.limit + 1)
+        .to_list()
+    )
+    if len(items) <= page.limit:
+        return items, None
+
+    items = items[:page.limit]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
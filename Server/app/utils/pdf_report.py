@@ -0,0 +1,307 @@
+"""Feedback PDF reports.
+
+The layout code (:func:`render_report`) is plain synchronous ReportLab that
+only sees dict rows, so it can run in a worker thread here and in a process
+pool for team exports. :func:`build_report` feeds it from the Mongo cursor
+while it draws, and finished PDFs are cached per employee until that
+employee's feedback changes. :func:`stream_team_archive` zips the reports of
+a whole team as they finish.
+"""
+import asyncio
+import io
+import multiprocessing
+import os
+import queue
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from app.models.feedback import Feedback
+from app.models.projections import FeedbackReportRow
+from app.utils.cache import TTLCache
+
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", 2))
+REPORT_PROCESS_WORKERS = int(os.getenv("REPORT_PROCESS_WORKERS", os.cpu_count() or 1))
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", 128))
+
+REPORT_BATCH_SIZE = 200
+REPORT_CHUNK_SIZE = 64 * 1024
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 50
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+FONT, BOLD_FONT, FONT_SIZE, LEADING = "Helvetica", "Helvetica-Bold", 10, 14
+
+_executor = ThreadPoolExecutor(max_workers=REPORT_RENDER_WORKERS, thread_name_prefix="pdf")
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# employee_id -> (feedback version, pdf bytes)
+_report_cache = TTLCache(maxsize=PDF_CACHE_MAX_ENTRIES)
+
+
+# -----------------------------
+# Layout
+# -----------------------------
+def report_row(fb: FeedbackReportRow) -> dict:
+    return {
+        "created_at": fb.created_at,
+        "sentiment": fb.sentiment,
+        "strengths": fb.strengths,
+        "improvement": fb.improvement,
+        "tags": list(fb.tags),
+    }
+
+
+class _ReportCanvas:
+    def __init__(self, out: BinaryIO):
+        self.canvas = canvas.Canvas(out, pagesize=A4)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def line(self, text: str, font: str = FONT) -> None:
+        if self.y < MARGIN:
+            self.canvas.showPage()
+            self.y = PAGE_HEIGHT - MARGIN
+        self.canvas.setFont(font, FONT_SIZE)
+        self.canvas.drawString(MARGIN, self.y, text)
+        self.y -= LEADING
+
+    def paragraph(self, text: str, font: str = FONT) -> None:
+        for line in simpleSplit(text, font, FONT_SIZE, TEXT_WIDTH) or [""]:
+            self.line(line, font)
+
+    def keep_together(self, line_count: int) -> None:
+        # Start a new page rather than split a short entry across two
+        if self.y - line_count * LEADING < MARGIN and line_count * LEADING < PAGE_HEIGHT / 3:
+            self.canvas.showPage()
+            self.y = PAGE_HEIGHT - MARGIN
+
+    def save(self) -> None:
+        self.canvas.save()
+
+
+def render_report(employee_id: str, rows: Iterable[dict], out: BinaryIO) -> None:
+    doc = _ReportCanvas(out)
+    doc.paragraph(f"Feedback Report for Employee ID: {employee_id}", BOLD_FONT)
+    doc.y -= LEADING
+
+    for row in rows:
+        heading = f"{row['created_at']:%Y-%m-%d} - {row['sentiment'].upper()}"
+        strengths = simpleSplit(f"Strengths: {row['strengths']}", FONT, FONT_SIZE, TEXT_WIDTH)
+        improvement = simpleSplit(f"Improvement: {row['improvement']}", FONT, FONT_SIZE, TEXT_WIDTH)
+        doc.keep_together(1 + len(strengths) + len(improvement) + bool(row["tags"]))
+
+        doc.line(heading, BOLD_FONT)
+        for line in strengths + improvement:
+            doc.line(line)
+        if row["tags"]:
+            doc.paragraph("Tags: " + ", ".join(row["tags"]))
+        doc.y -= LEADING / 2
+
+    doc.save()
+
+
+def render_report_bytes(employee_id: str, rows: List[dict]) -> bytes:
+    buf = io.BytesIO()
+    render_report(employee_id, rows, buf)
+    return buf.getvalue()
+
+
+# -----------------------------
+# Building and caching
+# -----------------------------
+def _drain(batches: "queue.Queue") -> Iterator[dict]:
+    while True:
+        batch = batches.get()
+        if batch is None:
+            return
+        yield from batch
+
+
+async def _hand_over(batches: "queue.Queue", batch: Optional[list], render: asyncio.Future) -> None:
+    # Wait for room in the queue without blocking the loop; stop if the renderer died
+    while True:
+        try:
+            batches.put_nowait(batch)
+            return
+        except queue.Full:
+            if render.done():
+                return
+            await asyncio.sleep(0.005)
+
+
+def feedback_query(employee_id: str):
+    return Feedback.find(
+        Feedback.employee_id == employee_id
+    ).sort("created_at").project(FeedbackReportRow)
+
+
+async def build_report(employee_id: str) -> bytes:
+    """Render a report while the feedback cursor is still being read."""
+    batches: "queue.Queue" = queue.Queue(maxsize=4)
+    buf = io.BytesIO()
+    loop = asyncio.get_running_loop()
+    render = loop.run_in_executor(_executor, render_report, employee_id, _drain(batches), buf)
+
+    try:
+        batch = []
+        async for fb in feedback_query(employee_id):
+            batch.append(report_row(fb))
+            if len(batch) >= REPORT_BATCH_SIZE:
+                await _hand_over(batches, batch, render)
+                batch = []
+        if batch:
+            await _hand_over(batches, batch, render)
+    finally:
+        await _hand_over(batches, None, render)
+
+    await render
+    return buf.getvalue()
+
+
+async def feedback_version(employee_id: str) -> Tuple:
+    """Changes whenever a feedback of the employee is created, edited or deleted."""
+    result = await Feedback.find(Feedback.employee_id == employee_id).aggregate([
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "last_created": {"$max": "$created_at"},
+            "last_updated": {"$max": "$updated_at"},
+        }}
+    ]).to_list()
+    if not result:
+        return (0, None, None)
+    return (result[0]["count"], result[0]["last_created"], result[0]["last_updated"])
+
+
+def cached_report(employee_id: str, version: Tuple) -> Optional[bytes]:
+    entry = _report_cache.get(employee_id)
+    if entry and entry[0] == version:
+        return entry[1]
+    return None
+
+
+def store_report(employee_id: str, version: Tuple, pdf: bytes) -> None:
+    _report_cache.set(employee_id, (version, pdf))
+
+
+async def get_report(employee_id: str) -> bytes:
+    version = await feedback_version(employee_id)
+    pdf = cached_report(employee_id, version)
+    if pdf is None:
+        pdf = await build_report(employee_id)
+        store_report(employee_id, version, pdf)
+    return pdf
+
+
+async def iter_chunks(data: bytes, chunk_size: int = REPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+# -----------------------------
+# Team export
+# -----------------------------
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Created inside the running server, whose threads (motor, the bcrypt
+        # pool) may hold locks; forking it could deadlock a worker
+        _process_pool = ProcessPoolExecutor(
+            max_workers=REPORT_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+async def _team_member_report(employee_id: str) -> Tuple[str, bytes]:
+    version = await feedback_version(employee_id)
+    pdf = cached_report(employee_id, version)
+    if pdf is None:
+        rows = [report_row(fb) async for fb in feedback_query(employee_id)]
+        loop = asyncio.get_running_loop()
+        pdf = await loop.run_in_executor(
+            _get_process_pool(), render_report_bytes, employee_id, rows
+        )
+        store_report(employee_id, version, pdf)
+    return employee_id, pdf
+
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only, unseekable sink; zipfile then emits streaming-friendly entries."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_name(employee_id: str) -> str:
+    return "feedback_" + re.sub(r"[^\w.-]", "_", employee_id) + ".pdf"
+
+
+async def stream_team_archive(employee_ids: Iterable[str]) -> AsyncIterator[bytes]:
+    """Yield a ZIP of every employee's report, adding entries as they finish.
+
+    At most ``2 * REPORT_PROCESS_WORKERS`` reports are in flight, so memory
+    stays bounded no matter how large the team is.
+    """
+    pending_ids = iter(employee_ids)
+    window = 2 * REPORT_PROCESS_WORKERS
+    running = set()
+    sink = _ZipChunks()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    timestamp = datetime.utcnow().timetuple()[:6]
+
+    def top_up():
+        for employee_id in pending_ids:
+            running.add(asyncio.ensure_future(_team_member_report(employee_id)))
+            if len(running) >= window:
+                return
+
+    try:
+        top_up()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            running.difference_update(done)
+            for task in done:
+                employee_id, pdf = task.result()
+                # PDFs are already compressed, so entries are stored as-is
+                archive.writestr(zipfile.ZipInfo(_archive_name(employee_id), timestamp), pdf)
+                yield sink.take()
+            top_up()
+
+        archive.close()
+        yield sink.take()
+    finally:
+        for task in running:
+            task.cancel()
+
+
+def report_cache_stats() -> dict:
+    return _report_cache.stats()
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False)
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
@@ -0,0 +1,145 @@
+"""Per-request Mongo query counting and N+1 detection.
+
+:class:`QueryCountMiddleware` puts a fresh :class:`QueryStats` in a
+contextvar for each request. Motor runs pymongo in executor threads with a
+copy of the caller's context, so the :class:`QueryCounter` command listener
+sees that same object and records every command the request sends. The
+response carries the total in ``X-DB-Queries``, and a warning is logged when
+a request sends more than ``DB_QUERY_WARN_THRESHOLD`` commands or repeats one
+query shape (same collection, operation and filter keys, values ignored)
+``DB_QUERY_REPEAT_THRESHOLD`` times, which is what a query in a loop looks
+like.
+"""
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from pymongo import monitoring
+
+from app.utils.metrics import route_template
+
+DB_QUERY_WARN_THRESHOLD = int(os.getenv("DB_QUERY_WARN_THRESHOLD", 20))
+DB_QUERY_REPEAT_THRESHOLD = int(os.getenv("DB_QUERY_REPEAT_THRESHOLD", 3))
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+
+# Driver bookkeeping that differs between otherwise identical commands
+_IGNORED_FIELDS = {"lsid", "txnNumber", "documents", "cursor", "batchSize", "comment"}
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.shapes: Counter = Counter()
+
+    def record(self, collection: str, operation: str, command) -> None:
+        self.count += 1
+        # A cursor's getMores repeat by design and are not separate queries
+        if operation != "getMore":
+            self.shapes[(collection, operation, query_shape(command, operation))] += 1
+
+    def repeated(self, threshold: int = DB_QUERY_REPEAT_THRESHOLD) -> list:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _shape(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)) and any(isinstance(v, dict) for v in value):
+        return tuple(_shape(v) for v in value)
+    return "?"
+
+
+def query_shape(command, operation: str) -> str:
+    return repr(_shape({
+        k: v for k, v in command.items()
+        if k != operation and not k.startswith("$") and k not in _IGNORED_FIELDS
+    }))
+
+
+class QueryCounter(monitoring.CommandListener):
+    def started(self, event):
+        stats = _current.get()
+        if stats is None:
+            return
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            stats.record(collection, event.command_name, event.command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+query_counter = QueryCounter()
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count the queries sent inside the block, e.g. in a test or a script."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def warn_if_excessive(label: str, stats: QueryStats) -> None:
+    if stats.count > DB_QUERY_WARN_THRESHOLD:
+        logger.warning("%s sent %d Mongo queries", label, stats.count)
+    for (collection, operation, shape), n in stats.repeated():
+        logger.warning(
+            "%s repeated a %s on %s %d times, likely a query in a loop: %s",
+            label, operation, collection, n, shape
+        )
+
+
+class QueryCountMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            route = route_template(scope, default=scope["path"])
+            warn_if_excessive(f"{scope['method']} {route}", stats)
+            _current.reset(token)
+
+
+def assert_max_queries(response, limit: int) -> None:
+    """Test helper: fail if a response from the app reports more than ``limit`` queries.
+
+    ``response`` is anything with a ``headers`` mapping, such as an httpx
+    or ``TestClient`` response.
+    """
+    count = int(response.headers[QUERY_COUNT_HEADER])
+    assert count <= limit, f"expected at most {limit} Mongo queries, got {count}"
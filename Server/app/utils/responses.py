@@ -0,0 +1,41 @@
+"""orjson responses for large list endpoints.
+
+List handlers build plain dicts that already match their response model
+and hand them to :func:`fast_json`, which returns the response directly so
+FastAPI neither validates them against ``response_model`` again nor walks
+them with ``jsonable_encoder``. Set ``FAST_JSON=0`` to fall back to the
+regular FastAPI serialization path with identical output.
+"""
+import os
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+FAST_JSON = os.getenv("FAST_JSON", "1") == "1"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(content: Any, response: Optional[Response] = None) -> Any:
+    """Return ``content`` as a ready response, keeping headers set on ``response``."""
+    if not FAST_JSON:
+        return content
+
+    fast = FastJSONResponse(content)
+    if response is not None:
+        fast.headers.update({
+            k: v for k, v in response.headers.items() if k.lower() != "content-length"
+        })
+    return fast
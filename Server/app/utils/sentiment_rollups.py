@@ -0,0 +1,180 @@
+"""Weekly and monthly sentiment counts per (manager, employee).
+
+Every feedback write adjusts the affected buckets of both periods with
+``$inc``, so trend queries read a few small rollup documents instead of
+scanning feedback. Buckets start on Monday (weeks) or the 1st (months),
+UTC, the same as ``$dateTrunc``. ``python -m app.utils.sentiment_rollups``
+rebuilds every bucket from the feedback collection; run it once after
+deploying and whenever the counts may have drifted, during a quiet period.
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from app.models.feedback import Feedback
+from app.models.sentiment_rollup import SentimentRollup
+from app.utils.pagination import as_naive_utc
+
+PERIODS = ("week", "month")
+SENTIMENTS = ("positive", "neutral", "negative")
+
+
+def _collection():
+    return SentimentRollup.get_motor_collection()
+
+
+def bucket_start(created_at: datetime, period: str) -> datetime:
+    if period == "week":
+        day = created_at.date() - timedelta(days=created_at.weekday())
+        return datetime(day.year, day.month, day.day)
+    return datetime(created_at.year, created_at.month, 1)
+
+
+def _field(fb, name: str):
+    # Feedback models and raw feedback documents alike
+    return fb[name] if isinstance(fb, dict) else getattr(fb, name)
+
+
+async def apply(feedbacks: Iterable, delta: int) -> None:
+    """Add (``delta=1``) or remove (``delta=-1``) feedbacks from their buckets."""
+    changes: Counter = Counter()
+    for fb in feedbacks:
+        for period in PERIODS:
+            key = (
+                _field(fb, "manager_employee_id"),
+                _field(fb, "employee_id"),
+                period,
+                bucket_start(_field(fb, "created_at"), period),
+            )
+            changes[key, _field(fb, "sentiment")] += delta
+    await _write(changes)
+
+
+async def change_sentiment(before, after) -> None:
+    """Move an edited feedback between sentiments; buckets never change."""
+    if _field(before, "sentiment") == _field(after, "sentiment"):
+        return
+    changes: Counter = Counter()
+    for period in PERIODS:
+        key = (
+            _field(before, "manager_employee_id"),
+            _field(before, "employee_id"),
+            period,
+            bucket_start(_field(before, "created_at"), period),
+        )
+        changes[key, _field(before, "sentiment")] -= 1
+        changes[key, _field(after, "sentiment")] += 1
+    await _write(changes)
+
+
+async def _write(changes: Counter) -> None:
+    increments: dict = {}
+    for (key, sentiment), n in changes.items():
+        if n:
+            increments.setdefault(key, {})[sentiment] = n
+    if not increments:
+        return
+    await _collection().bulk_write(
+        [
+            UpdateOne(
+                {"manager_employee_id": manager_id, "employee_id": employee_id,
+                 "period": period, "bucket": bucket},
+                {"$inc": inc},
+                upsert=True,
+            )
+            for (manager_id, employee_id, period, bucket), inc in increments.items()
+        ],
+        ordered=False,
+    )
+
+
+async def remove_manager(manager_id: str) -> None:
+    """Drop every bucket of a manager whose feedback was all deleted."""
+    await _collection().delete_many({"manager_employee_id": manager_id})
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+async def trends(
+    match: dict,
+    period: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[dict]:
+    """Sum the buckets matching ``match`` into one series, oldest first."""
+    since = as_naive_utc(since) if since else None
+    until = as_naive_utc(until) if until else None
+    bucket_range = {}
+    if since:
+        bucket_range["$gte"] = bucket_start(since, period)
+    if until:
+        bucket_range["$lte"] = until
+    query = {**match, "period": period}
+    if bucket_range:
+        query["bucket"] = bucket_range
+
+    series = await SentimentRollup.find(query).aggregate([
+        {"$group": {"_id": "$bucket", **{s: {"$sum": f"${s}"} for s in SENTIMENTS}}},
+        {"$sort": {"_id": 1}},
+    ]).to_list()
+    return [
+        {"bucket": row["_id"], **{s: max(0, row[s]) for s in SENTIMENTS}}
+        for row in series
+    ]
+
+
+# -----------------------------
+# Full rebuild
+# -----------------------------
+def _rebuild_pipeline(period: str) -> list:
+    truncate = {"date": "$created_at", "unit": period}
+    if period == "week":
+        truncate["startOfWeek"] = "monday"
+    return [
+        {"$group": {
+            "_id": {
+                "manager_employee_id": "$manager_employee_id",
+                "employee_id": "$employee_id",
+                "bucket": {"$dateTrunc": truncate},
+            },
+            **{s: {"$sum": {"$cond": [{"$eq": ["$sentiment", s]}, 1, 0]}} for s in SENTIMENTS},
+        }},
+        {"$project": {
+            "_id": 0,
+            "manager_employee_id": "$_id.manager_employee_id",
+            "employee_id": "$_id.employee_id",
+            "period": {"$literal": period},
+            "bucket": "$_id.bucket",
+            **{s: 1 for s in SENTIMENTS},
+        }},
+        {"$merge": {
+            "into": SentimentRollup.Settings.name,
+            "on": ["manager_employee_id", "period", "bucket", "employee_id"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+async def rebuild_rollups() -> int:
+    """Recompute every bucket from feedback (needs MongoDB 5.0 for ``$dateTrunc``)."""
+    await _collection().delete_many({})
+    for period in PERIODS:
+        await Feedback.get_motor_collection().aggregate(_rebuild_pipeline(period)).to_list(None)
+    return await _collection().count_documents({})
+
+
+async def _main() -> None:
+    from app.db.mongo import init_db
+
+    await init_db()
+    buckets = await rebuild_rollups()
+    print(f"Rebuilt {buckets} sentiment rollup buckets.")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
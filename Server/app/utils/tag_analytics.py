@@ -0,0 +1,62 @@
+"""Most used feedback tags of a team, split by sentiment.
+
+The aggregation runs over the manager's feedback, so its result is cached
+per manager under that manager's version stamp (see
+:mod:`app.utils.versioning`). Any feedback write bumps the stamp, and the
+next read recomputes, on every worker, without explicit invalidation. The
+aggregation always reads from the primary, so a cached result is never
+older than the version it is stored under.
+"""
+import os
+from typing import List
+
+from app.db.routing import primary_reads
+from app.models.feedback import Feedback
+from app.utils.cache import TTLCache
+
+TAG_CACHE_MAX_SIZE = int(os.getenv("TAG_CACHE_MAX_SIZE", 1024))
+
+# manager_id -> (version, all tags ordered by use)
+_tag_cache = TTLCache(maxsize=TAG_CACHE_MAX_SIZE)
+
+
+def _pipeline() -> list:
+    return [
+        {"$project": {"tags": 1, "sentiment": 1}},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": {"tag": "$tags", "sentiment": "$sentiment"}, "count": {"$sum": 1}}},
+        {"$group": {
+            "_id": "$_id.tag",
+            "count": {"$sum": "$count"},
+            "sentiments": {"$push": {"k": "$_id.sentiment", "v": "$count"}},
+        }},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+async def team_tags(manager_id: str, limit: int, version: int) -> List[dict]:
+    """``version`` is the manager's stamp, as already read by ``check_etag``."""
+    entry = _tag_cache.get(manager_id)
+    if entry and entry[0] == version:
+        return entry[1][:limit]
+
+    with primary_reads():
+        rows = await Feedback.find(
+            Feedback.manager_employee_id == manager_id
+        ).aggregate(_pipeline()).to_list()
+    tags = []
+    for row in rows:
+        sentiments = {s["k"]: s["v"] for s in row["sentiments"]}
+        tags.append({
+            "tag": row["_id"],
+            "count": row["count"],
+            "positive": sentiments.get("positive", 0),
+            "neutral": sentiments.get("neutral", 0),
+            "negative": sentiments.get("negative", 0),
+        })
+    _tag_cache.set(manager_id, (version, tags))
+    return tags[:limit]
+
+
+def tag_cache_stats() -> dict:
+    return _tag_cache.stats()
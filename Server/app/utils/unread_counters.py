@@ -0,0 +1,155 @@
+"""Per-user counters of unseen notifications and feedback requests.
+
+Every write that changes a ``seen`` flag or creates an unseen item adjusts
+the owner's counter with ``$inc``, so badges are a single indexed read.
+``python -m app.utils.unread_counters`` rebuilds all counters from the
+source collections if they ever drift.
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+
+from app.models.feedback_request import FeedbackRequest
+from app.models.notification import Notification
+from app.models.unread_counter import UnreadCounter
+from app.db.atomic import conditional_update
+
+
+def _collection():
+    return UnreadCounter.get_motor_collection()
+
+
+async def increment(employee_id: str, notifications: int = 0, feedback_requests: int = 0) -> None:
+    await _collection().update_one(
+        {"employee_id": employee_id},
+        {"$inc": {"notifications": notifications, "feedback_requests": feedback_requests}},
+        upsert=True,
+    )
+
+
+async def increment_notifications(counts: Dict[str, int]) -> None:
+    if not counts:
+        return
+    await _collection().bulk_write(
+        [
+            UpdateOne({"employee_id": employee_id}, {"$inc": {"notifications": n}}, upsert=True)
+            for employee_id, n in counts.items()
+        ],
+        ordered=False,
+    )
+
+
+async def get_counts(employee_id: str) -> dict:
+    counter = await _collection().find_one({"employee_id": employee_id})
+    counter = counter or {}
+    return {
+        "unseen_notifications": max(0, counter.get("notifications", 0)),
+        "unseen_feedback_requests": max(0, counter.get("feedback_requests", 0)),
+    }
+
+
+# -----------------------------
+# State changes that move the counters
+# -----------------------------
+async def set_notification_seen(notification_id, seen: bool) -> bool:
+    """Set ``seen`` on a notification; returns False if it does not exist."""
+    before, exists = await conditional_update(
+        Notification,
+        notification_id,
+        {"$set": {"seen": seen}},
+        conditions={"seen": not seen},
+        projection={"employee_id": 1},
+    )
+    if before is not None:
+        await increment(before["employee_id"], notifications=1 if not seen else -1)
+    # Not updated but existing means it already had the requested state
+    return exists
+
+
+async def mark_all_notifications_seen(employee_id: str) -> int:
+    result = await Notification.get_motor_collection().update_many(
+        {"employee_id": employee_id, "seen": False},
+        {"$set": {"seen": True}},
+    )
+    if result.modified_count:
+        await increment(employee_id, notifications=-result.modified_count)
+    return result.modified_count
+
+
+async def mark_feedback_request_seen(
+    request_id, conditions: Optional[dict] = None
+) -> Tuple[Optional[dict], bool]:
+    """Mark a request seen; returns ``(request, exists)``.
+
+    ``conditions`` restricts who may do it, e.g. to the request's manager;
+    ``request`` is None if it does not exist or the conditions failed.
+    """
+    before, exists = await conditional_update(
+        FeedbackRequest,
+        request_id,
+        {"$set": {"seen": True}},
+        conditions=conditions,
+        projection={"manager_employee_id": 1, "seen": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None, exists
+    if not before["seen"]:
+        await increment(before["manager_employee_id"], feedback_requests=-1)
+    return before, True
+
+
+# -----------------------------
+# Rebuild from source
+# -----------------------------
+async def _unseen_by(collection, owner_field: str) -> Dict[str, int]:
+    rows = await collection.aggregate([
+        {"$match": {"seen": False}},
+        {"$group": {"_id": f"${owner_field}", "count": {"$sum": 1}}},
+    ]).to_list(None)
+    return {row["_id"]: row["count"] for row in rows}
+
+
+async def reconcile_counters() -> int:
+    """Recompute every counter from the notification and request collections.
+
+    Writes that land while this runs may be counted twice or not at all;
+    run it during a quiet period.
+    """
+    notifications = await _unseen_by(Notification.get_motor_collection(), "employee_id")
+    requests = await _unseen_by(FeedbackRequest.get_motor_collection(), "manager_employee_id")
+    owners = set(notifications) | set(requests)
+
+    await _collection().update_many(
+        {"employee_id": {"$nin": list(owners)}},
+        {"$set": {"notifications": 0, "feedback_requests": 0}},
+    )
+    if owners:
+        await _collection().bulk_write(
+            [
+                UpdateOne(
+                    {"employee_id": owner},
+                    {"$set": {
+                        "notifications": notifications.get(owner, 0),
+                        "feedback_requests": requests.get(owner, 0),
+                    }},
+                    upsert=True,
+                )
+                for owner in owners
+            ],
+            ordered=False,
+        )
+    return len(owners)
+
+
+async def _main() -> None:
+    from app.db.mongo import init_db
+
+    await init_db()
+    owners = await reconcile_counters()
+    print(f"Rebuilt unread counters; {owners} users have unseen items.")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,76 @@
+import os
+from typing import Dict, Iterable, Optional
+
+from app.db.routing import primary_reads
+from app.models.user import User
+from app.models.projections import UserSummary
+from app.utils.cache import TTLCache
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 300))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
+
+_MISSING = object()
+
+
+class UserDirectory:
+    """In-process cache of users keyed by ``employee_id``.
+
+    Used for name and role lookups, which vastly outnumber user writes, so
+    only a :class:`UserSummary` (no email or password hash) is fetched.
+    Unknown ids are cached as ``None`` too, so repeated lookups of a deleted
+    manager do not hit Mongo either. Every handler that writes a user must
+    call :meth:`invalidate` for the ids it touched. Lookups always read the
+    primary, so a lagging secondary cannot refill the cache with stale users.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, employee_id: str) -> Optional[UserSummary]:
+        user = self._cache.get(employee_id, _MISSING)
+        if user is _MISSING:
+            with primary_reads():
+                user = await User.find_one(User.employee_id == employee_id).project(UserSummary)
+            self._cache.set(employee_id, user)
+        return user
+
+    async def get_many(self, employee_ids: Iterable[str]) -> Dict[str, Optional[UserSummary]]:
+        found: Dict[str, Optional[UserSummary]] = {}
+        missing = []
+        for employee_id in set(employee_ids):
+            user = self._cache.get(employee_id, _MISSING)
+            if user is _MISSING:
+                missing.append(employee_id)
+            else:
+                found[employee_id] = user
+
+        if missing:
+            with primary_reads():
+                users = await User.find(
+                    {"employee_id": {"$in": missing}}
+                ).project(UserSummary).to_list()
+            fetched = {u.employee_id: u for u in users}
+            for employee_id in missing:
+                user = fetched.get(employee_id)
+                self._cache.set(employee_id, user)
+                found[employee_id] = user
+
+        return found
+
+    async def get_with_role(self, employee_id: str, role: str) -> Optional[UserSummary]:
+        user = await self.get(employee_id)
+        return user if user and user.role == role else None
+
+    def invalidate(self, *employee_ids: Optional[str]) -> None:
+        for employee_id in employee_ids:
+            if employee_id:
+                self._cache.pop(employee_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+user_directory = UserDirectory(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,183 @@
+"""Bulk user import from CSV or NDJSON.
+
+Rows are parsed from the request stream and handled in chunks: each chunk
+is validated with two ``$in`` queries (existing ids, referenced managers),
+its passwords are hashed in parallel on the bulk process pool, and it is
+written with one unordered ``insert_many``. Managers created earlier in the
+same file can be referenced by later rows. CSV rows must not contain
+embedded newlines.
+"""
+import csv
+import json
+import os
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.auth.hash import bulk_password_hasher
+from app.models.projections import EmployeeId
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.utils.user_directory import user_directory
+from app.utils import versioning
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+
+ParsedRow = Tuple[int, Union[dict, str]]
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    pending = b""
+    async for chunk in stream:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_rows(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[ParsedRow]:
+    """Yield ``(row_number, fields)``, or ``(row_number, error)`` for bad lines."""
+    header: Optional[List[str]] = None
+    row_number = 0
+    async for line in _iter_lines(stream):
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = next(csv.reader([line]))
+            continue
+
+        row_number += 1
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if len(values) != len(header):
+                yield row_number, f"Expected {len(header)} columns, got {len(values)}."
+                continue
+            # Empty cells mean "not set", e.g. manager_employee_id for managers
+            yield row_number, {k: v for k, v in zip(header, values) if v != ""}
+        else:
+            try:
+                fields = json.loads(line)
+            except ValueError as exc:
+                yield row_number, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(fields, dict):
+                yield row_number, "Each line must be a JSON object."
+                continue
+            yield row_number, fields
+
+
+def _error(row: int, employee_id: Optional[str], detail: str) -> dict:
+    return {"row": row, "employee_id": employee_id, "status": "error", "detail": detail}
+
+
+class UserImport:
+    def __init__(self):
+        self.results: List[dict] = []
+        self._seen_ids: Set[str] = set()
+        self._managers: Set[str] = set()
+
+    async def run(self, rows: AsyncIterator[ParsedRow], chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+        chunk: List[ParsedRow] = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                await self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk)
+
+        self.results.sort(key=lambda r: r["row"])
+        created = sum(1 for r in self.results if r["status"] == "created")
+        return {
+            "created": created,
+            "failed": len(self.results) - created,
+            "results": self.results,
+        }
+
+    async def _import_chunk(self, chunk: List[ParsedRow]) -> None:
+        valid: Dict[int, UserCreate] = {}
+        for row, fields in chunk:
+            if isinstance(fields, str):
+                self.results.append(_error(row, None, fields))
+                continue
+            try:
+                user = UserCreate(**fields)
+            except ValidationError as exc:
+                self.results.append(_error(row, fields.get("employee_id"), str(exc)))
+                continue
+            if user.employee_id in self._seen_ids:
+                self.results.append(_error(row, user.employee_id, "Duplicate employee ID in file."))
+                continue
+            if user.role == "employee" and not user.manager_employee_id:
+                self.results.append(_error(row, user.employee_id, "manager_employee_id required for employees."))
+                continue
+            self._seen_ids.add(user.employee_id)
+            valid[row] = user
+
+        if not valid:
+            return
+
+        existing = {
+            u.employee_id for u in await User.find(
+                {"employee_id": {"$in": [u.employee_id for u in valid.values()]}}
+            ).project(EmployeeId).to_list()
+        }
+
+        chunk_managers = {
+            u.employee_id for u in valid.values()
+            if u.role == "manager" and u.employee_id not in existing
+        }
+        referenced = {
+            u.manager_employee_id for u in valid.values() if u.role == "employee"
+        } - self._managers - chunk_managers
+        known_managers = self._managers | chunk_managers
+        if referenced:
+            known_managers |= {
+                u.employee_id for u in await User.find(
+                    {"employee_id": {"$in": list(referenced)}, "role": "manager"}
+                ).project(EmployeeId).to_list()
+            }
+
+        to_insert: List[Tuple[int, UserCreate]] = []
+        for row, user in valid.items():
+            if user.employee_id in existing:
+                self.results.append(_error(row, user.employee_id, "Employee ID already exists."))
+            elif user.role == "employee" and user.manager_employee_id not in known_managers:
+                self.results.append(_error(row, user.employee_id, "Manager not found."))
+            else:
+                to_insert.append((row, user))
+
+        if not to_insert:
+            return
+
+        hashes = await bulk_password_hasher.hash_many(u.password for _, u in to_insert)
+        docs = [
+            User(**user.dict(exclude={"password"}), password=hashed)
+            for (_, user), hashed in zip(to_insert, hashes)
+        ]
+
+        failed: Dict[int, str] = {}
+        try:
+            await User.insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            for err in exc.details.get("writeErrors", []):
+                failed[err["index"]] = (
+                    "Employee ID already exists." if err.get("code") == 11000 else err.get("errmsg", "Insert failed.")
+                )
+
+        new_reports: Set[str] = set()
+        for index, (row, user) in enumerate(to_insert):
+            if index in failed:
+                self.results.append(_error(row, user.employee_id, failed[index]))
+                continue
+            self.results.append({"row": row, "employee_id": user.employee_id, "status": "created"})
+            if user.role == "manager":
+                self._managers.add(user.employee_id)
+            elif user.manager_employee_id:
+                new_reports.add(user.manager_employee_id)
+            user_directory.invalidate(user.employee_id)
+
+        await versioning.bump(*(versioning.manager_scope(m) for m in new_reports))
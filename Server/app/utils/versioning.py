@@ -0,0 +1,104 @@
+"""Version stamps and conditional GETs.
+
+Every write that changes what an employee's or a manager's read endpoints
+return bumps a counter for that scope. Those endpoints derive a weak ETag
+from the scope's counter and the request URL, and answer a matching
+``If-None-Match`` with ``304 Not Modified`` after a single indexed read,
+before running any of their queries.
+"""
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import Request, Response
+from pymongo import UpdateOne
+
+from app.db.routing import primary_for_request
+from app.models.version_stamp import VersionStamp
+from app.utils.user_directory import user_directory
+
+
+def employee_scope(employee_id: str) -> str:
+    return f"employee:{employee_id}"
+
+
+def manager_scope(manager_id: str) -> str:
+    return f"manager:{manager_id}"
+
+
+def _collection():
+    return VersionStamp.get_motor_collection()
+
+
+async def bump(*scopes: Optional[str]) -> None:
+    scopes = {s for s in scopes if s}
+    if not scopes:
+        return
+    await _collection().bulk_write(
+        [UpdateOne({"scope": s}, {"$inc": {"version": 1}}, upsert=True) for s in scopes],
+        ordered=False,
+    )
+
+
+async def feedback_scopes(employee_ids: Iterable[str], author_manager_id: Optional[str] = None) -> List[str]:
+    """Scopes affected by a feedback change: the employees, the authoring
+    manager, and each employee's own manager (whose dashboard counts it)."""
+    employee_ids = set(employee_ids)
+    scopes = [employee_scope(e) for e in employee_ids]
+    if author_manager_id:
+        scopes.append(manager_scope(author_manager_id))
+    for user in (await user_directory.get_many(employee_ids)).values():
+        if user and user.manager_employee_id:
+            scopes.append(manager_scope(user.manager_employee_id))
+    return scopes
+
+
+async def bump_feedback(employee_ids: Iterable[str], author_manager_id: Optional[str] = None) -> None:
+    await bump(*await feedback_scopes(employee_ids, author_manager_id))
+
+
+async def versions(scopes: List[str]) -> Dict[str, int]:
+    docs = await _collection().find(
+        {"scope": {"$in": scopes}}, {"_id": 0, "scope": 1, "version": 1}
+    ).to_list(None)
+    return {d["scope"]: d["version"] for d in docs}
+
+
+async def etag_for(request: Request, *scopes: str) -> str:
+    current = await versions(list(scopes))
+    # Kept for the handler (see request_version), saving it a second read
+    request.state.versions = current
+    key = "|".join(
+        [request.url.path, request.url.query] + [f"{s}={current.get(s, 0)}" for s in scopes]
+    )
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def request_version(request: Request, scope: str) -> int:
+    """Version of ``scope`` as read by :func:`check_etag` for this request."""
+    return request.state.versions.get(scope, 0)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: W/"x" matches "x"
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+async def check_etag(request: Request, response: Response, *scopes: str) -> Optional[Response]:
+    """Set the ETag header; returns a 304 response if the client is current.
+
+    The stamps are read with the route's read preference, before any data.
+    On a miss the rest of the request reads from the primary, so the data
+    sent is never older than its ETag: a lagging secondary can then only
+    cause an extra full response later, never a 304 that outlives a write.
+    Routes calling this need a read preference dependency.
+    """
+    etag = await etag_for(request, *scopes)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    primary_for_request()
+    return None
@@ -0,0 +1,113 @@
+"""Compare full-document reads with the projected reads used by the routers.
+
+Seeds one employee with a long feedback history into a throw-away database,
+then reports for each read shape the BSON bytes returned by the server, the
+time spent decoding them into models, and the end-to-end query time.
+
+    cd Server
+    python -m benchmarks.projections --feedbacks 5000 --repeat 5
+
+Needs a MongoDB server; set BENCH_MONGODB_URI (default
+mongodb://localhost:27017). The database is dropped afterwards.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import bson
+import motor.motor_asyncio
+from beanie import init_beanie
+from beanie.odm.utils.projection import get_projection
+
+from app.models.feedback import Feedback
+from app.models.projections import FeedbackReportRow, FeedbackSummary, FeedbackView
+
+EMPLOYEE_ID = "BENCH-E1"
+CASES = [
+    ("full document", Feedback),
+    ("FeedbackView (histories)", FeedbackView),
+    ("FeedbackSummary (employee dashboard)", FeedbackSummary),
+    ("FeedbackReportRow (PDF export)", FeedbackReportRow),
+]
+
+
+def synthetic_feedback(i: int) -> Feedback:
+    paragraph = "Consistently delivers well-structured work and communicates clearly. " * 20
+    return Feedback(
+        manager_employee_id="BENCH-M1",
+        employee_id=EMPLOYEE_ID,
+        strengths=f"#{i} {paragraph}",
+        improvement=f"#{i} {paragraph}",
+        sentiment=("positive", "neutral", "negative")[i % 3],
+        tags=["communication", "ownership", "delivery", "mentoring", "quality"],
+        comments=[
+            {"employee_id": EMPLOYEE_ID, "text": paragraph, "html": f"<p>{paragraph}</p>"}
+            for _ in range(5)
+        ],
+        comment_count=5,
+        created_at=datetime.utcnow() - timedelta(minutes=i),
+    )
+
+
+async def measure(model, repeat: int) -> dict:
+    projection = None if model is Feedback else get_projection(model)
+    collection = Feedback.get_motor_collection()
+    raw = await collection.find(
+        {"employee_id": EMPLOYEE_ID}, projection
+    ).to_list(None)
+    payloads = [bson.encode(doc) for doc in raw]
+
+    decode_times, query_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in payloads:
+            model.model_validate(bson.decode(data))
+        decode_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        query = Feedback.find(Feedback.employee_id == EMPLOYEE_ID)
+        if model is not Feedback:
+            query = query.project(model)
+        await query.to_list()
+        query_times.append(time.perf_counter() - start)
+
+    return {
+        "bytes": sum(len(p) for p in payloads),
+        "decode_ms": statistics.median(decode_times) * 1000,
+        "query_ms": statistics.median(query_times) * 1000,
+    }
+
+
+async def main(feedbacks: int, repeat: int) -> None:
+    uri = os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017")
+    client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+    database = client["feedback_projection_bench"]
+    await init_beanie(database=database, document_models=[Feedback])
+    try:
+        await Feedback.insert_many([synthetic_feedback(i) for i in range(feedbacks)])
+
+        baseline = None
+        print(f"{feedbacks} feedback documents, median of {repeat} runs\n")
+        print(f"{'read shape':38} {'bytes':>12} {'decode ms':>10} {'query ms':>10}")
+        for name, model in CASES:
+            result = await measure(model, repeat)
+            baseline = baseline or result
+            print(
+                f"{name:38} {result['bytes']:>12,} {result['decode_ms']:>10.1f} {result['query_ms']:>10.1f}"
+                f"   ({result['bytes'] / baseline['bytes']:.0%} of bytes,"
+                f" {result['decode_ms'] / baseline['decode_ms']:.0%} of decode time)"
+            )
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feedbacks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.feedbacks, args.repeat))
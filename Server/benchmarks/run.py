@@ -0,0 +1,441 @@
+"""Drive every API endpoint and report throughput and latency percentiles.
+
+Each scenario sends ``--requests`` requests (scaled by its weight) with
+``--concurrency`` in flight against ids picked at random from a seeded
+organization (see ``benchmarks.seed``), then reports throughput and
+p50/p95/p99 latency. Destructive endpoints act on users and feedback that
+the scenario creates beforehand, outside the timed request. The SSE stream
+is not covered, as it never completes.
+
+    cd Server
+    python -m benchmarks.seed --reset                     # once
+    python -m benchmarks.run --save-baseline base.json    # before a change
+    python -m benchmarks.run --baseline base.json         # after it
+
+By default requests go to a running server (``--url``) whose MONGODB_URI
+points at the seeded database. ``--in-process`` calls the app directly over
+httpx's ASGI transport instead, connecting to BENCH_MONGODB_URI, and
+``--mongomock`` additionally swaps MongoDB for mongomock_motor, for smoke
+runs only: scenarios that need an aggregation mongomock lacks (e.g. the
+manager dashboard's ``$lookup`` with ``let``) are reported as errors, and
+read preferences are not applied. Both in-process modes seed with
+``--seed``.
+
+Needs httpx (and mongomock_motor for ``--mongomock``), which are not app
+dependencies. Exits non-zero if a scenario regressed beyond ``--tolerance``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.seed import BENCH_DATABASE, BENCH_MONGODB_URI, TAGS, Org, reset, seed_org
+
+# Builds the keyword arguments of one timed AsyncClient.request call
+Prepare = Callable[["Context"], Awaitable[dict]]
+
+_unique = itertools.count()
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    org: Org
+    rng: random.Random
+
+    def __post_init__(self):
+        self._employees = list(self.org.employees)
+
+    def manager(self) -> str:
+        return self.rng.choice(self.org.managers)
+
+    def employee(self) -> str:
+        return self.rng.choice(self._employees)
+
+    def feedback(self) -> List[str]:
+        return self.rng.choice(self.org.feedbacks)
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}{time.time_ns()}{next(_unique)}"
+
+    async def new_employee(self, manager_id: str) -> str:
+        employee_id = self.new_id("BX")
+        await self.client.post("/users/", json=user_payload(employee_id, "employee", manager_id))
+        return employee_id
+
+    async def new_feedback(self, manager_id: str, employee_id: str) -> str:
+        response = await self.client.post("/feedback/", json=feedback_payload(manager_id, employee_id))
+        return response.json()["id"]
+
+
+@dataclass
+class Scenario:
+    name: str
+    prepare: Prepare
+    # Share of --requests this scenario sends; keeps PDF exports and bcrypt short
+    weight: float = 1.0
+
+
+def user_payload(employee_id: str, role: str, manager_id: Optional[str] = None) -> dict:
+    return {
+        "name": f"Bench {employee_id}",
+        "email": f"{employee_id.lower()}@bench.example.com",
+        "password": "bench-password",
+        "role": role,
+        "employee_id": employee_id,
+        "manager_employee_id": manager_id,
+    }
+
+
+def feedback_payload(manager_id: str, employee_id: str) -> dict:
+    return {
+        "manager_employee_id": manager_id,
+        "employee_id": employee_id,
+        "strengths": "Shipped the release on time.",
+        "improvement": "Write more design notes up front.",
+        "sentiment": "positive",
+        "tags": ["delivery", "documentation"],
+    }
+
+
+def get(path: Callable[["Context"], str]) -> Prepare:
+    async def prepare(ctx: Context) -> dict:
+        return {"method": "GET", "url": path(ctx)}
+    return prepare
+
+
+# -----------------------------
+# Scenarios
+# -----------------------------
+async def _login(ctx):
+    return {"method": "POST", "url": "/users/login",
+            "json": {"employee_id": ctx.employee(), "password": ctx.org.password}}
+
+
+async def _create_user(ctx):
+    return {"method": "POST", "url": "/users/",
+            "json": user_payload(ctx.new_id("BX"), "employee", ctx.manager())}
+
+
+async def _bulk_users(ctx):
+    manager_id = ctx.manager()
+    rows = [json.dumps(user_payload(ctx.new_id("BX"), "employee", manager_id)) for _ in range(5)]
+    return {"method": "POST", "url": "/users/bulk", "content": "\n".join(rows),
+            "headers": {"Content-Type": "application/x-ndjson"}}
+
+
+async def _update_employee(ctx):
+    employee_id = ctx.employee()
+    manager_id = ctx.org.employees[employee_id]
+    # UserUpdate declares every field, so unchanged ones are sent as they are
+    update = user_payload(employee_id, "employee", manager_id)
+    update.update(name=f"Employee {ctx.rng.randrange(1000)}", password=None)
+    del update["employee_id"]
+    return {"method": "PUT", "url": f"/users/{manager_id}/{employee_id}", "json": update}
+
+
+async def _delete_employee(ctx):
+    manager_id = ctx.manager()
+    employee_id = await ctx.new_employee(manager_id)
+    return {"method": "DELETE", "url": f"/users/{manager_id}/{employee_id}"}
+
+
+async def _change_password(ctx):
+    return {"method": "PATCH", "url": f"/users/change-password/{ctx.employee()}",
+            "json": {"old_password": ctx.org.password, "new_password": ctx.org.password}}
+
+
+async def _forgot_password(ctx):
+    employee_id = ctx.employee()
+    return {"method": "PATCH", "url": f"/users/forgot-password/{employee_id}",
+            "json": {"employee_id": employee_id, "new_password": ctx.org.password}}
+
+
+async def _create_feedback(ctx):
+    employee_id = ctx.employee()
+    return {"method": "POST", "url": "/feedback/",
+            "json": feedback_payload(ctx.org.employees[employee_id], employee_id)}
+
+
+async def _bulk_feedback(ctx):
+    manager_id = ctx.manager()
+    team = [e for e, m in ctx.org.employees.items() if m == manager_id][:5]
+    template = feedback_payload(manager_id, "")
+    del template["manager_employee_id"], template["employee_id"]
+    return {"method": "POST", "url": "/feedback/bulk",
+            "json": {"manager_employee_id": manager_id, "template": template, "employee_ids": team}}
+
+
+async def _request_feedback(ctx):
+    employee_id = ctx.employee()
+    return {"method": "POST", "url": "/feedback/request",
+            "json": {"employee_id": employee_id, "manager_employee_id": ctx.org.employees[employee_id],
+                     "message": "Could I get feedback on the release?"}}
+
+
+async def _request_seen(ctx):
+    return {"method": "PATCH", "url": f"/feedback/requests/{ctx.rng.choice(ctx.org.requests)}/seen"}
+
+
+async def _acknowledge(ctx):
+    return {"method": "PATCH", "url": f"/feedback/acknowledge/{ctx.feedback()[0]}"}
+
+
+async def _update_feedback(ctx):
+    feedback_id, employee_id, manager_id = ctx.feedback()
+    return {"method": "PUT", "url": f"/feedback/{feedback_id}",
+            "json": feedback_payload(manager_id, employee_id)}
+
+
+async def _delete_feedback(ctx):
+    employee_id = ctx.employee()
+    feedback_id = await ctx.new_feedback(ctx.org.employees[employee_id], employee_id)
+    return {"method": "DELETE", "url": f"/feedback/{feedback_id}"}
+
+
+async def _delete_all(ctx):
+    manager_id = ctx.new_id("BXM")
+    await ctx.client.post("/users/", json=user_payload(manager_id, "manager"))
+    employee_id = await ctx.new_employee(manager_id)
+    for _ in range(5):
+        await ctx.new_feedback(manager_id, employee_id)
+    return {"method": "DELETE", "url": f"/feedback/manager/{manager_id}"}
+
+
+async def _comment(ctx):
+    feedback_id, employee_id, _ = ctx.feedback()
+    return {"method": "POST", "url": f"/feedback/comment/{feedback_id}",
+            "json": {"employee_id": employee_id, "text": "Thanks, **agreed**."}}
+
+
+async def _notification_seen(ctx):
+    return {"method": "PATCH", "url": f"/notifications/notifications/{ctx.rng.choice(ctx.org.notifications)}",
+            "params": {"seen": "true"}}
+
+
+async def _all_seen(ctx):
+    return {"method": "PATCH", "url": f"/notifications/notifications/mark-all-seen/{ctx.employee()}"}
+
+
+SCENARIOS = [
+    Scenario("POST /users/login", _login, 0.25),
+    Scenario("POST /users/", _create_user, 0.25),
+    Scenario("POST /users/bulk", _bulk_users, 0.1),
+    Scenario("GET /users/dashboard/manager/{id}", get(lambda c: f"/users/dashboard/manager/{c.manager()}")),
+    Scenario("GET /users/dashboard/employee/{id}", get(lambda c: f"/users/dashboard/employee/{c.employee()}")),
+    Scenario("GET /users/manager/{id}/employees", get(lambda c: f"/users/manager/{c.manager()}/employees")),
+    Scenario("PUT /users/{manager}/{employee}", _update_employee),
+    Scenario("DELETE /users/{manager}/{employee}", _delete_employee, 0.25),
+    Scenario("PATCH /users/change-password/{id}", _change_password, 0.25),
+    Scenario("PATCH /users/forgot-password/{id}", _forgot_password, 0.25),
+    Scenario("POST /feedback/", _create_feedback),
+    Scenario("POST /feedback/bulk", _bulk_feedback, 0.25),
+    Scenario("POST /feedback/request", _request_feedback),
+    Scenario("GET /feedback/requests/{id}", get(lambda c: f"/feedback/requests/{c.manager()}")),
+    Scenario("PATCH /feedback/requests/{id}/seen", _request_seen),
+    Scenario("GET /feedback/requests/{id}/count-unseen", get(lambda c: f"/feedback/requests/{c.manager()}/count-unseen")),
+    Scenario("GET /feedback/employee/{id}", get(lambda c: f"/feedback/employee/{c.employee()}")),
+    Scenario("GET /feedback/manager/{id}", get(lambda c: f"/feedback/manager/{c.manager()}")),
+    Scenario("PATCH /feedback/acknowledge/{id}", _acknowledge),
+    Scenario("PUT /feedback/{id}", _update_feedback),
+    Scenario("DELETE /feedback/{id}", _delete_feedback, 0.5),
+    Scenario("DELETE /feedback/manager/{id}", _delete_all, 0.1),
+    Scenario("POST /feedback/comment/{id}", _comment),
+    Scenario("GET /feedback/comment/{id}", get(lambda c: f"/feedback/comment/{c.feedback()[0]}")),
+    Scenario("GET /feedback/export/{id}", get(lambda c: f"/feedback/export/{c.employee()}"), 0.1),
+    Scenario("GET /feedback/export/manager/{id}", get(lambda c: f"/feedback/export/manager/{c.manager()}"), 0.05),
+    Scenario("GET /feedback/manager/{id}?tag=", get(lambda c: f"/feedback/manager/{c.manager()}?tag={c.rng.choice(TAGS)}")),
+    Scenario("GET /feedback/tags/manager/{id}", get(lambda c: f"/feedback/tags/manager/{c.manager()}")),
+    Scenario("GET /feedback/trends/manager/{id}", get(lambda c: f"/feedback/trends/manager/{c.manager()}?period=month")),
+    Scenario("GET /feedback/trends/employee/{id}", get(lambda c: f"/feedback/trends/employee/{c.employee()}")),
+    Scenario("GET /feedback/notifications/{id}", get(lambda c: f"/feedback/notifications/{c.employee()}")),
+    Scenario("GET /notifications/notifications/{id}", get(lambda c: f"/notifications/notifications/{c.employee()}")),
+    Scenario("PATCH /notifications/notifications/{id}", _notification_seen),
+    Scenario("PATCH /notifications/notifications/mark-all-seen/{id}", _all_seen),
+    Scenario("GET /notifications/badge/{id}", get(lambda c: f"/notifications/badge/{c.employee()}")),
+]
+
+
+# -----------------------------
+# Running and reporting
+# -----------------------------
+def percentile(samples: List[float], p: int) -> float:
+    if not samples:
+        return float("nan")
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1] if len(samples) > 1 else samples[0]
+
+
+async def run_scenario(ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    """Non-2xx responses and exceptions count as errors, by status code or
+    exception type, without stopping the run."""
+    total = max(1, int(requests * scenario.weight))
+    remaining = iter(range(total))
+    latencies: List[float] = []
+    failures: Counter = Counter()
+
+    async def worker():
+        for _ in remaining:
+            try:
+                kwargs = await scenario.prepare(ctx)
+                start = time.perf_counter()
+                response = await ctx.client.request(**kwargs)
+            except Exception as exc:
+                failures[type(exc).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if not response.is_success:
+                failures[str(response.status_code)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": sum(failures.values()),
+        "failures": dict(failures),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def _change(now: float, before: float) -> str:
+    return f"{(now - before) / before:+.0%}" if before else "n/a"
+
+
+def report(results: Dict[str, dict], baseline: Optional[Dict[str, dict]], tolerance: float) -> List[str]:
+    """Print the results table; returns the scenarios that regressed."""
+    header = f"{'scenario':58} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}"
+    if baseline:
+        header += f" {'Δ req/s':>8} {'Δ p95':>7}"
+    print(header)
+
+    regressed = []
+    for name, r in results.items():
+        line = (
+            f"{name:58} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.1f} "
+            f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>6}"
+        )
+        before = (baseline or {}).get(name)
+        if before:
+            line += f" {_change(r['throughput_rps'], before['throughput_rps']):>8} {_change(r['p95_ms'], before['p95_ms']):>7}"
+            if (
+                r["p95_ms"] > before["p95_ms"] * (1 + tolerance)
+                or r["throughput_rps"] < before["throughput_rps"] * (1 - tolerance)
+            ):
+                regressed.append(name)
+                line += "  REGRESSED"
+        if r.get("failures"):
+            line += "  (" + ", ".join(f"{k}: {n}" for k, n in sorted(r["failures"].items())) + ")"
+        print(line)
+    return regressed
+
+
+async def _open_client(args):
+    """Returns the HTTP client and a coroutine function that cleans up."""
+    if not (args.in_process or args.mongomock):
+        return httpx.AsyncClient(base_url=args.url, timeout=args.timeout), None
+
+    from app.db.mongo import close_db, init_db
+    from app.main import app
+    from app.utils.notifications import notification_writer
+
+    client = None
+    if args.mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        from app.db.routing import disable_read_routing
+        client = AsyncMongoMockClient()
+        # mongomock's collections cannot be re-created with a read preference
+        disable_read_routing()
+    await init_db(BENCH_MONGODB_URI, client=client, database=BENCH_DATABASE)
+    await notification_writer.start()
+
+    async def cleanup():
+        await notification_writer.stop()
+        close_db()
+
+    # Unhandled app errors become 500 responses, as behind a real server
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout), cleanup
+
+
+async def _seed(args) -> None:
+    await reset()
+    org = await seed_org(
+        args.managers, args.employees, args.feedbacks, rollups=not args.mongomock
+    )
+    org.save(args.manifest)
+
+
+async def _main(args) -> int:
+    in_process = args.in_process or args.mongomock
+    if args.seed and not in_process:
+        from app.db.mongo import close_db, init_db
+        await init_db(BENCH_MONGODB_URI, database=BENCH_DATABASE)
+        try:
+            await _seed(args)
+        finally:
+            close_db()
+
+    client, cleanup = await _open_client(args)
+    try:
+        if args.seed and in_process:
+            await _seed(args)
+        org = Org.load(args.manifest)
+
+        ctx = Context(client, org, random.Random(args.random_seed))
+        results = {}
+        for scenario in SCENARIOS:
+            if args.only and args.only not in scenario.name:
+                continue
+            results[scenario.name] = await run_scenario(ctx, scenario, args.requests, args.concurrency)
+    finally:
+        await client.aclose()
+        if cleanup:
+            await cleanup()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressed = report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressed:
+        print(f"\n{len(regressed)} scenario(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="call the app over the ASGI transport")
+    parser.add_argument("--mongomock", action="store_true", help="in-process against mongomock_motor")
+    parser.add_argument("--manifest", default="bench_org.json", help="written by benchmarks.seed")
+    parser.add_argument("--seed", action="store_true", help="reset and seed the database first")
+    parser.add_argument("--managers", type=int, default=10, help="with --seed")
+    parser.add_argument("--employees", type=int, default=10, help="with --seed, per manager")
+    parser.add_argument("--feedbacks", type=int, default=10, help="with --seed, per employee")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario, before weights")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--only", help="run scenarios whose name contains this")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--baseline", help="compare against results saved with --save-baseline")
+    parser.add_argument("--save-baseline", help="write this run's results as JSON")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed regression, e.g. 0.1 = 10%%")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,242 @@
+"""Seed a synthetic organization for benchmarks and load tests.
+
+Creates N managers with M employees each, and per employee K feedbacks
+(with comments), notifications and feedback requests, all with bulk
+inserts. Unread counters are filled in to match. Every user's password is
+``BENCH_PASSWORD``. The ids the benchmark runner needs are written to a
+small JSON manifest.
+
+    cd Server
+    python -m benchmarks.seed --managers 20 --employees 25 --feedbacks 20 --reset
+
+Writes to BENCH_MONGODB_URI (default mongodb://localhost:27017/feedback_bench);
+start the server with MONGODB_URI pointing at the same database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from beanie import PydanticObjectId
+from pymongo import uri_parser
+
+from app.auth.hash import hash_password
+from app.db.mongo import DOCUMENT_MODELS, close_db, init_db
+from app.models.comment import Comment
+from app.models.feedback import Feedback
+from app.models.feedback_request import FeedbackRequest
+from app.models.notification import Notification
+from app.models.unread_counter import UnreadCounter
+from app.models.user import User
+from app.utils.comment_store import LATEST_COMMENTS
+from app.utils.markdown_render import render_markdown
+from app.utils.sentiment_rollups import rebuild_rollups
+
+BENCH_MONGODB_URI = os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017/feedback_bench")
+BENCH_DATABASE = uri_parser.parse_uri(BENCH_MONGODB_URI)["database"] or "feedback_bench"
+BENCH_PASSWORD = "bench-password"
+INSERT_CHUNK_SIZE = 1000
+# Ids of each kind kept in the manifest; enough for random picks without bloating it
+MANIFEST_SAMPLE = 2000
+
+TAGS = [
+    "communication", "ownership", "delivery", "mentoring", "quality",
+    "collaboration", "planning", "initiative", "documentation", "testing",
+]
+SENTIMENTS = ("positive", "neutral", "negative")
+SENTIMENT_WEIGHTS = (6, 3, 1)
+SENTENCES = [
+    "Delivered the **migration** ahead of schedule.",
+    "Communicates blockers early and clearly.",
+    "Could spend more time reviewing teammates' changes.",
+    "Took ownership of the on-call rotation.",
+    "Documentation of the new service is still thin.",
+    "Great mentoring of the new joiners.",
+]
+
+
+@dataclass
+class Org:
+    managers: List[str] = field(default_factory=list)
+    # employee_id -> manager_employee_id
+    employees: Dict[str, str] = field(default_factory=dict)
+    # [feedback_id, employee_id, manager_employee_id]
+    feedbacks: List[List[str]] = field(default_factory=list)
+    requests: List[str] = field(default_factory=list)
+    notifications: List[str] = field(default_factory=list)
+    password: str = BENCH_PASSWORD
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, path: str) -> "Org":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+async def _insert(model, docs: list) -> None:
+    for start in range(0, len(docs), INSERT_CHUNK_SIZE):
+        await model.insert_many(docs[start:start + INSERT_CHUNK_SIZE])
+
+
+def _text(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(SENTENCES) for _ in range(sentences))
+
+
+async def reset() -> None:
+    for model in DOCUMENT_MODELS:
+        await model.get_motor_collection().delete_many({})
+
+
+async def seed_org(
+    managers: int,
+    employees_per_manager: int,
+    feedbacks_per_employee: int,
+    comments_per_feedback: int = 2,
+    notifications_per_employee: int = 10,
+    requests_per_employee: int = 1,
+    seed: int = 0,
+    rollups: bool = True,
+) -> Org:
+    """Insert the organization; expects ``init_db`` to have run.
+
+    ``rollups=False`` skips building sentiment rollups, which needs
+    ``$dateTrunc`` and so a real MongoDB 5.0+.
+    """
+    rng = random.Random(seed)
+    org = Org()
+    now = datetime.utcnow()
+    password = hash_password(BENCH_PASSWORD)  # one bcrypt hash shared by everyone
+    rendered = {s: render_markdown(s) for s in SENTENCES}
+
+    users, feedbacks, comments, notifications, requests, counters = [], [], [], [], [], []
+    batches = (
+        (User, users), (Feedback, feedbacks), (Comment, comments),
+        (Notification, notifications), (FeedbackRequest, requests), (UnreadCounter, counters),
+    )
+
+    async def flush():
+        for model, docs in batches:
+            await _insert(model, docs)
+            docs.clear()
+
+    for m in range(managers):
+        manager_id = f"BM{m:04d}"
+        org.managers.append(manager_id)
+        users.append(User(
+            name=f"Manager {m}", email=f"manager{m}@bench.example.com", password=password,
+            role="manager", employee_id=manager_id,
+        ))
+        unseen_requests = 0
+
+        for e in range(employees_per_manager):
+            employee_id = f"BE{m:04d}{e:04d}"
+            org.employees[employee_id] = manager_id
+            users.append(User(
+                name=f"Employee {m}-{e}", email=f"employee{m}.{e}@bench.example.com",
+                password=password, role="employee", employee_id=employee_id,
+                manager_employee_id=manager_id,
+            ))
+
+            for _ in range(feedbacks_per_employee):
+                created_at = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+                fb_id = PydanticObjectId()
+                entries = []
+                for _ in range(comments_per_feedback):
+                    text = rng.choice(SENTENCES)
+                    entries.append({"employee_id": employee_id, "text": text, "html": rendered[text]})
+                    comments.append(Comment(
+                        feedback_id=fb_id, created_at=created_at, **entries[-1]
+                    ))
+                feedbacks.append(Feedback(
+                    id=fb_id,
+                    manager_employee_id=manager_id,
+                    employee_id=employee_id,
+                    strengths=_text(rng, 3),
+                    improvement=_text(rng, 2),
+                    sentiment=rng.choices(SENTIMENTS, SENTIMENT_WEIGHTS)[0],
+                    tags=rng.sample(TAGS, rng.randint(0, 3)),
+                    comments=entries[-LATEST_COMMENTS:],
+                    comment_count=len(entries),
+                    acknowledged=rng.random() < 0.5,
+                    created_at=created_at,
+                ))
+                if len(org.feedbacks) < MANIFEST_SAMPLE:
+                    org.feedbacks.append([str(fb_id), employee_id, manager_id])
+
+            unseen_notifications = 0
+            for _ in range(notifications_per_employee):
+                seen = rng.random() < 0.7
+                unseen_notifications += not seen
+                notifications.append(Notification(
+                    id=PydanticObjectId(),
+                    employee_id=employee_id,
+                    manager_employee_id=manager_id,
+                    manager_name=f"Manager {m}",
+                    message="Your manager submitted new feedback.",
+                    seen=seen,
+                    created_at=now - timedelta(minutes=rng.randrange(90 * 24 * 60)),
+                ))
+                if len(org.notifications) < MANIFEST_SAMPLE:
+                    org.notifications.append(str(notifications[-1].id))
+            counters.append(UnreadCounter(employee_id=employee_id, notifications=unseen_notifications))
+
+            for _ in range(requests_per_employee):
+                seen = rng.random() < 0.5
+                unseen_requests += not seen
+                requests.append(FeedbackRequest(
+                    id=PydanticObjectId(),
+                    employee_id=employee_id,
+                    manager_employee_id=manager_id,
+                    message="Could I get feedback on my last project?",
+                    seen=seen,
+                    created_at=now - timedelta(minutes=rng.randrange(30 * 24 * 60)),
+                ))
+                if len(org.requests) < MANIFEST_SAMPLE:
+                    org.requests.append(str(requests[-1].id))
+
+        counters.append(UnreadCounter(employee_id=manager_id, feedback_requests=unseen_requests))
+        # Insert one team at a time so large orgs never sit in memory at once
+        await flush()
+
+    if rollups:
+        await rebuild_rollups()
+    return org
+
+
+async def _main(args) -> None:
+    await init_db(BENCH_MONGODB_URI, database=BENCH_DATABASE)
+    try:
+        if args.reset:
+            await reset()
+        org = await seed_org(
+            args.managers, args.employees, args.feedbacks,
+            args.comments, args.notifications, args.requests, args.seed,
+        )
+    finally:
+        close_db()
+    org.save(args.manifest)
+    print(
+        f"Seeded {len(org.managers)} managers, {len(org.employees)} employees; "
+        f"manifest written to {args.manifest}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--managers", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=25, help="employees per manager")
+    parser.add_argument("--feedbacks", type=int, default=20, help="feedbacks per employee")
+    parser.add_argument("--comments", type=int, default=2, help="comments per feedback")
+    parser.add_argument("--notifications", type=int, default=10, help="notifications per employee")
+    parser.add_argument("--requests", type=int, default=1, help="feedback requests per employee")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, for reproducible data")
+    parser.add_argument("--reset", action="store_true", help="empty the app's collections first")
+    parser.add_argument("--manifest", default="bench_org.json")
+    asyncio.run(_main(parser.parse_args()))
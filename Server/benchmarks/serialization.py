@@ -0,0 +1,77 @@
+"""Compare FastAPI's default list serialization with the fast JSON path.
+
+Runs offline on synthetic rows shaped like a feedback history response:
+
+    cd Server
+    python -m benchmarks.serialization --rows 2000 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.feedback import FeedbackOut
+from app.utils.responses import FastJSONResponse
+
+
+def synthetic_rows(count: int) -> list:
+    text = "Delivers reliably and communicates clearly with the team. " * 8
+    return [
+        SimpleNamespace(
+            id=ObjectId(),
+            manager_employee_id="M1",
+            employee_id="E1",
+            strengths=text,
+            improvement=text,
+            sentiment="positive",
+            anonymous=False,
+            tags=["delivery", "communication"],
+            comments=[{"employee_id": "E1", "text": f"<p>{text}</p>"}] * 3,
+            comment_count=3,
+            acknowledged=True,
+            created_at=datetime.utcnow() - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def default_path(rows) -> bytes:
+    # from_feedback models, re-validated via response_model, then encoded
+    models = [FeedbackOut.from_feedback(fb, "Manager") for fb in rows]
+    validated = TypeAdapter(List[FeedbackOut]).validate_python(
+        [m.model_dump() for m in models]
+    )
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def fast_path(rows) -> bytes:
+    return FastJSONResponse([FeedbackOut.dump_feedback(fb, "Manager") for fb in rows]).body
+
+
+def main(rows: int, repeat: int) -> None:
+    data = synthetic_rows(rows)
+    assert json.loads(default_path(data)) == json.loads(fast_path(data))
+
+    for name, fn in (("default", default_path), ("fast_json", fast_path)):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(data)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings) * 1000
+        print(f"{name:10} {median:8.2f} ms for {rows} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
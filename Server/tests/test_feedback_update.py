@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import feedback
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Stubs every database step of the update endpoint, recording calls."""
+    calls = []
+
+    async def resolve_caller(*args, **kwargs):
+        calls.append("resolve_caller")
+
+    async def update_or_raise(*args, **kwargs):
+        calls.append("update_or_raise")
+
+    async def change_sentiment(*args, **kwargs):
+        calls.append("change_sentiment")
+
+    monkeypatch.setattr(feedback, "resolve_caller", resolve_caller)
+    monkeypatch.setattr(feedback, "update_or_raise", update_or_raise)
+    monkeypatch.setattr(feedback.sentiment_rollups, "change_sentiment", change_sentiment)
+    return calls
+
+
+def test_update_rejects_unknown_sentiment_before_writing(writes):
+    # Not entered as a context manager, so startup never connects to MongoDB
+    client = TestClient(app)
+    response = client.put("/feedback/0123456789abcdef01234567", json={
+        "manager_employee_id": "M1",
+        "employee_id": "E1",
+        "strengths": "Ships on time.",
+        "improvement": "More reviews.",
+        "sentiment": "great",
+    })
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "sentiment"]
+    assert writes == []
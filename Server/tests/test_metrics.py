@@ -0,0 +1,33 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.metrics import MetricsMiddleware, render_metrics
+
+
+def _router() -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    return router
+
+
+def test_routes_of_different_routers_get_distinct_labels():
+    app = FastAPI()
+    app.include_router(_router(), prefix="/alpha")
+    app.include_router(_router(), prefix="/beta")
+    app.add_middleware(MetricsMiddleware)
+
+    client = TestClient(app)
+    assert client.get("/alpha/items/1").status_code == 200
+    assert client.get("/beta/items/2").status_code == 200
+    assert client.get("/gamma").status_code == 404
+
+    rendered = render_metrics()
+    assert 'route="/alpha/items/{item_id}",status="200"' in rendered
+    assert 'route="/beta/items/{item_id}",status="200"' in rendered
+    assert 'route="unmatched",status="404"' in rendered
+    # Templates, never concrete paths
+    assert "/alpha/items/1" not in rendered
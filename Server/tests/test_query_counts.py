@@ -0,0 +1,55 @@
+"""Query budgets of the list endpoints.
+
+Needs a real MongoDB (the aggregations and the command listener that
+counts queries are not available in mongomock); point TEST_MONGODB_URI at
+a throwaway database, e.g. ``mongodb://localhost:27017/feedback_test``.
+"""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from app.db.mongo import close_db, init_db
+from app.main import app
+from app.utils.query_counter import assert_max_queries
+from benchmarks.seed import reset, seed_org
+
+TEST_MONGODB_URI = os.getenv("TEST_MONGODB_URI")
+
+pytestmark = pytest.mark.skipif(not TEST_MONGODB_URI, reason="TEST_MONGODB_URI is not set")
+
+# Version stamp, the page itself and one user lookup (the caller, or the
+# authors of the page in one batch), however large the team is
+LIST_ENDPOINTS = [
+    ("/users/dashboard/manager/{manager}", 3),
+    ("/feedback/manager/{manager}", 3),
+    ("/feedback/employee/{employee}", 3),
+]
+
+
+async def _get_all(path: str) -> list:
+    await init_db(TEST_MONGODB_URI)
+    try:
+        await reset()
+        org = await seed_org(managers=1, employees_per_manager=25, feedbacks_per_employee=4)
+        url = path.format(manager=org.managers[0], employee=next(iter(org.employees)))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get(url)
+            cached = await client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+        return [first, cached]
+    finally:
+        await reset()
+        close_db()
+
+
+@pytest.mark.parametrize("path,limit", LIST_ENDPOINTS)
+def test_list_endpoint_query_budget(path, limit):
+    first, cached = asyncio.run(_get_all(path))
+
+    assert first.status_code == 200
+    assert_max_queries(first, limit)
+    # A conditional hit stops after the version stamp
+    assert cached.status_code == 304
+    assert_max_queries(cached, 2)